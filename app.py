@@ -3,43 +3,51 @@
 # =============================================================
 
 import streamlit as st
-import numpy as np
-from sentence_transformers import SentenceTransformer
 import time
 import re
 
+from modules import serving
+from modules.categories import category_label
+from modules.executor import Overloaded, RequestTimeout
+from modules.model_registry import MODELS, available_models, default_model
+from modules.text_cleaning import split_sub_questions
+
 # =============================================================
 # 1. Load Model + Embeddings (cached)
 # =============================================================
-@st.cache_resource
-def load_model():
-    return SentenceTransformer("intfloat/multilingual-e5-base")
-
-@st.cache_resource
-def load_embeddings():
-    data = np.load("embeddings_all.npz", allow_pickle=True)
-    return (
-        data["corpus_embeddings"],
-        data["answers"],
-        data["questions"],
-    )
-
-model = load_model()
-corpus_emb, corpus_ans, corpus_qs = load_embeddings()
+# Sudah dimuat + di-warm-up oleh launcher (python -m modules.serving);
+# bila dijalankan dengan `streamlit run app.py`, dimuat di sini.
+# Model dipilih per request (model_registry.py); serving menyimpan
+# model + index per proses, jadi aman dipanggil dari thread executor.
+# Hanya model yang sudah di-preload + warm-up (MEDISEARCH_MODELS) dan
+# store-nya sudah dibangun yang ditawarkan: memilih model lain berarti
+# memuat SentenceTransformer di tengah request, dalam keadaan dingin.
+serving.start_http_server()
+serving.warm_up_replica()
+MODEL_KEYS = sorted(
+    [k for k in serving.preload_models() if k in available_models()]
+    or serving.preload_models(),
+    key=lambda k: k != default_model())
 
 # =============================================================
 # 2. Retrieval Function
 # =============================================================
-def retrieve(query):
-    q = "query: " + query
-    q_emb = model.encode(q, convert_to_numpy=True, normalize_embeddings=True)
-    scores = np.dot(corpus_emb, q_emb)
-    ranked = scores.argsort()[::-1]
-    return ranked, scores
+# serving.retrieve / serving.retrieve_batch: jalur yang sama dengan
+# POST /search dan load test (coarse search, PRF, cache encode query).
+
+def run_retrieval(fn, *args):
+    """Jalankan retrieval di thread pool bersama (antrean + timeout).
+
+    Antrean penuh / timeout → pesan ke user, script berhenti.
+    """
+    try:
+        return serving.get_executor().run(fn, *args)
+    except Overloaded:
+        st.error("⏳ **Server sedang sibuk** - Silakan coba lagi beberapa saat lagi")
+    except RequestTimeout:
+        st.error("⌛ **Waktu pencarian habis** - Silakan coba lagi")
+    st.stop()
 
-# =============================================================
-# 3. Validation Functions
-# =============================================================
 def is_meaningful_question(text):
     """Check if the question is meaningful"""
     cleaned = re.sub(r'\s+', ' ', text.strip())
@@ -416,16 +424,183 @@ with st.form(key='medical_query_form'):
         help="Jelaskan keluhan kesehatan Anda sejelas mungkin untuk hasil yang akurat"
     )
     
+    multi_mode = st.checkbox(
+        "Pisahkan beberapa pertanyaan dalam satu pesan",
+        help="Setiap pertanyaan dicari dan dijawab terpisah"
+    )
+
+    model_key = MODEL_KEYS[0]
+    if len(MODEL_KEYS) > 1:
+        model_key = st.selectbox(
+            "Model pencarian",
+            MODEL_KEYS,
+            format_func=lambda k: MODELS[k]["label"],
+        )
+
+    # Spesialisasi dari bitmap kategori di store model terpilih
+    # (kategori kosong tidak ditampilkan)
+    category_counts = {
+        key: len(rows) for key, rows in
+        serving.get_index(model_key).snapshot().category_index.items()
+        if len(rows)
+    }
+    category = None
+    if category_counts:
+        category = st.selectbox(
+            "Spesialisasi",
+            [None] + list(category_counts),
+            format_func=lambda k: ("Semua spesialisasi" if k is None else
+                                   f"{category_label(k)} ({category_counts[k]})"),
+            help="Batasi pencarian ke pertanyaan-jawaban spesialisasi tertentu",
+        )
+
     submit_button = st.form_submit_button("🚀 **Cari Jawaban**", use_container_width=True)
 
 # =============================================================
 # 11. Processing and Results
 # =============================================================
-THRESHOLD = 0.85
+# Terkalibrasi dari dataset (python -m modules.kalibrasi), default 0.85 / 0.9
+THRESHOLDS = serving.get_thresholds(model_key)  # per model / store
+THRESHOLD = THRESHOLDS["relevant"]
+HIGH_CONFIDENCE = THRESHOLDS["high"]  # scan berhenti bila TOP_K+1 hit >= nilai ini
 TOP_K = 5  # Fixed to 5 related answers
 
+def build_candidates(result, corpus_ans):
+    """Kandidat terkait (tanpa jawaban utama).
+
+    Hit sudah tersaring >= THRESHOLD; kosong bila tidak ada yang lolos.
+    """
+    return [
+        {
+            "idx": i,
+            "answer": corpus_ans[i],
+            "score": score
+        }
+        for i, score in result["hits"]
+        if i != result["best_idx"]  # Skip the main answer
+    ][:TOP_K]
+
+def render_main_answer(answer_html, best_score, processing_time,
+                       title="### 🎯 **Jawaban Utama**"):
+    """answer_html: jawaban yang sudah di-escape (snap.snippets)."""
+    st.markdown("---")
+    st.markdown(title)
+    
+    # Score styling
+    if best_score >= HIGH_CONFIDENCE:
+        score_emoji = "✅"
+        score_text = "Sangat Relevan"
+    elif best_score >= THRESHOLD:
+        score_emoji = "ℹ️"
+        score_text = "Relevan"
+    else:
+        score_emoji = "⚠️"
+        score_text = "Cukup Relevan"
+
+    confidence = serving.score_confidence(best_score, model_key)
+    if confidence is not None:
+        score_text += f" • Presisi ≈ {confidence:.0%}"
+
+    st.markdown(f"""
+    <div class="answer-card">
+        <div class="answer-header">
+            <div>
+                <span class="score-badge">
+                    {score_emoji} {score_text} • Skor: {best_score:.4f}
+                </span>
+            </div>
+            <div style="color: #64748b; font-size: 0.9rem;">
+                ⏱️ Diproses dalam {processing_time:.2f} detik
+            </div>
+        </div>
+        <div class="answer-text">
+            {answer_html}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Low score warning
+    if best_score < THRESHOLD:
+        st.warning("""
+        **Perhatian**: Jawaban ini memiliki tingkat relevansi yang sedang. 
+        Untuk diagnosis dan penanganan yang tepat, disarankan untuk berkonsultasi 
+        langsung dengan dokter atau tenaga medis profesional.
+        """)
+
+def is_duplicate(a, b, threshold=0.88):
+    """Cek kemiripan sederhana untuk hilangkan duplikat."""
+    a_norm = a.replace(" ", "").lower()
+    b_norm = b.replace(" ", "").lower()
+    if not a_norm or not b_norm:
+        return False
+    same = sum(1 for x, y in zip(a_norm, b_norm) if x == y)
+    sim = same / max(len(a_norm), len(b_norm))
+    return sim >= threshold
+
+# =============================================================
+# Related Answers - Updated Design (tanpa duplikat & tanpa nan)
+# =============================================================
+def render_related(candidates, best_answer, snippets):
+    if not candidates:
+        return
+
+    st.markdown("---")
+    st.markdown("### 💡 **Jawaban lain yang mungkin membantu:**")
+
+    unique_candidates = []
+    seen_texts = []
+
+    # Filter duplikat & nan
+    for item in candidates:
+        text = str(item["answer"]).strip()
+
+        # Skip nan / kosong
+        if not text or text.lower() == "nan":
+            continue
+
+        # Skip kalau mirip dengan jawaban utama
+        if is_duplicate(text, str(best_answer)):
+            continue
+
+        # Skip kalau mirip dengan candidate yang sudah masuk
+        if any(is_duplicate(text, t) for t in seen_texts):
+            continue
+
+        unique_candidates.append(item)
+        seen_texts.append(text)
+
+    # Tampilkan candidate unik (preview + HTML ter-escape dari store)
+    for idx, candidate in enumerate(unique_candidates, start=1):
+        preview_html = snippets.preview_html(candidate["idx"])
+
+        # Jawaban pendek (<= 100 karakter) tidak punya preview
+        if preview_html is None:
+            continue
+
+        st.markdown(f"""
+          <div class="related-answer-item">
+              <div class="answer-number">{idx}</div>
+              <div class="answer-content">
+                  <details>
+                      <summary class="answer-preview" style="cursor:pointer;">
+                          {preview_html}
+                      </summary>
+                      <div style="margin-top: 10px; color:#374151; line-height:1.6;">
+                          {snippets.answer_html(candidate["idx"])}
+                      </div>
+                  </details>
+                  <div class="answer-score">Skor {candidate['score']:.4f}</div>
+              </div>
+          </div>
+      """, unsafe_allow_html=True)
+
+def is_invalid_answer(answer):
+    return answer is None or str(answer).lower() == "nan"
+
 if submit_button:
     cleaned_question = question.strip()
+    sub_questions = (split_sub_questions(cleaned_question)
+                     if multi_mode else [cleaned_question])
     
     # Validation
     if not cleaned_question:
@@ -454,19 +629,48 @@ if submit_button:
         - *"Anak saya usia 3 tahun demam 38.5°C selama 2 hari, disertai batuk dan nafsu makan menurun. Apakah perlu dibawa ke dokter?"*
         - *"Apa perbedaan gejala flu biasa dengan COVID-19? Saya mengalami pilek, sakit tenggorokan, dan sedikit demam."*
         """)
+    elif len(sub_questions) > 1:
+        # Multi-pertanyaan: satu batch encode + satu matmul
+        with st.spinner(f"🔍 **Mencari jawaban untuk {len(sub_questions)} pertanyaan...**"):
+            start_time = time.time()
+            results, snap = run_retrieval(
+                serving.retrieve_batch, sub_questions, THRESHOLD, TOP_K + 1, model_key,
+                category
+            )
+            processing_time = time.time() - start_time
+
+        for i, (sub_q, result) in enumerate(zip(sub_questions, results), start=1):
+            # best_idx -1: tidak ada baris yang di-scan (kategori kosong)
+            best_answer = (snap.answers[result["best_idx"]]
+                           if result["best_idx"] >= 0 else None)
+            title = f"### ❓ **Pertanyaan {i}:** *{sub_q}*"
+            if is_invalid_answer(best_answer):
+                st.markdown("---")
+                st.markdown(title)
+                st.warning("Maaf, sistem tidak menemukan jawaban yang sesuai untuk pertanyaan ini.")
+                continue
+            render_main_answer(snap.snippets.answer_html(result["best_idx"]),
+                               result["best_score"], processing_time, title)
+            render_related(build_candidates(result, snap.answers), best_answer,
+                           snap.snippets)
     else:
         # Processing
         with st.spinner("🔍 **Menganalisis pertanyaan dan mencari jawaban terbaik...**"):
             start_time = time.time()
-            ranked, scores = retrieve(cleaned_question)
+            result, snap = run_retrieval(
+                serving.retrieve, cleaned_question, THRESHOLD, TOP_K + 1, HIGH_CONFIDENCE,
+                model_key, category
+            )
             processing_time = time.time() - start_time
+            corpus_ans = snap.answers
 
-            best_idx = ranked[0]
-            best_answer = corpus_ans[best_idx]
-            best_score = float(scores[best_idx])
+            best_idx = result["best_idx"]
+            # -1: tidak ada baris yang di-scan (kategori kosong) → tanpa jawaban
+            best_answer = corpus_ans[best_idx] if best_idx >= 0 else None
+            best_score = result["best_score"]
 
             # === Tambahkan di sini ===
-            if best_answer is None or str(best_answer).lower() == "nan":
+            if is_invalid_answer(best_answer):
                 st.markdown("""
                 <div class="warning-box">
                     <h4 style="margin-top: 0; color: #92400e;">🤔 Jawaban Tidak Valid</h4>
@@ -487,131 +691,10 @@ if submit_button:
             # =========================
 
 
-        # Get relevant candidates (excluding the main answer)
-        candidates = [
-            {
-                "answer": corpus_ans[i],
-                "score": float(scores[i])
-            }
-            for i in ranked[1:TOP_K+1]  # Skip the first one (main answer)
-            if float(scores[i]) >= THRESHOLD
-        ]
-
-        # Main Answer
-        st.markdown("---")
-        st.markdown("### 🎯 **Jawaban Utama**")
-        
-        # Score styling
-        if best_score >= 0.9:
-            score_emoji = "✅"
-            score_text = "Sangat Relevan"
-        elif best_score >= 0.85:
-            score_emoji = "ℹ️"
-            score_text = "Relevan"
-        else:
-            score_emoji = "⚠️"
-            score_text = "Cukup Relevan"
-
-        st.markdown(f"""
-        <div class="answer-card">
-            <div class="answer-header">
-                <div>
-                    <span class="score-badge">
-                        {score_emoji} {score_text} • Skor: {best_score:.4f}
-                    </span>
-                </div>
-                <div style="color: #64748b; font-size: 0.9rem;">
-                    ⏱️ Diproses dalam {processing_time:.2f} detik
-                </div>
-            </div>
-            <div class="answer-text">
-                {best_answer}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        # Low score warning
-        if best_score < THRESHOLD:
-            st.warning("""
-            **Perhatian**: Jawaban ini memiliki tingkat relevansi yang sedang. 
-            Untuk diagnosis dan penanganan yang tepat, disarankan untuk berkonsultasi 
-            langsung dengan dokter atau tenaga medis profesional.
-            """)
-
-        # =============================================================
-        # Related Answers - Updated Design (tanpa duplikat & tanpa nan)
-        # =============================================================
-        if True:  # dipaksa True agar tidak NameError
-            if candidates:
-                st.markdown("---")
-                st.markdown("### 💡 **Jawaban lain yang mungkin membantu:**")
-
-                unique_candidates = []
-                seen_texts = []
-
-                def is_duplicate(a, b, threshold=0.88):
-                    """Cek kemiripan sederhana untuk hilangkan duplikat."""
-                    a_norm = a.replace(" ", "").lower()
-                    b_norm = b.replace(" ", "").lower()
-                    if not a_norm or not b_norm:
-                        return False
-                    same = sum(1 for x, y in zip(a_norm, b_norm) if x == y)
-                    sim = same / max(len(a_norm), len(b_norm))
-                    return sim >= threshold
-
-                # Filter duplikat & nan
-                for item in candidates:
-                    text = str(item["answer"]).strip()
-
-                    # Skip nan / kosong
-                    if not text or text.lower() == "nan":
-                        continue
-
-                    # Skip kalau mirip dengan jawaban utama
-                    if is_duplicate(text, str(best_answer)):
-                        continue
-
-                    # Skip kalau mirip dengan candidate yang sudah masuk
-                    if any(is_duplicate(text, t) for t in seen_texts):
-                        continue
-
-                    unique_candidates.append(item)
-                    seen_texts.append(text)
-
-                # Tampilkan candidate unik
-                for idx, candidate in enumerate(unique_candidates, start=1):
-                    preview_text = str(candidate["answer"]).strip()
-
-                    if not preview_text or preview_text.lower() == "nan":
-                        continue
-
-                    # BUAT PREVIEW AGAR RAPI
-                    if len(preview_text) > 100:
-                        snippet = preview_text[:100]
-                        if "." in snippet:
-                            cutoff = snippet.rfind(".") + 1
-                        elif " " in snippet:
-                            cutoff = snippet.rfind(" ") + 1
-                        else:
-                            cutoff = 100
-                        preview_text = preview_text[:cutoff].strip() + "..."
-
-                        st.markdown(f"""
-                          <div class="related-answer-item">
-                              <div class="answer-number">{idx}</div>
-                              <div class="answer-content">
-                                  <details>
-                                      <summary class="answer-preview" style="cursor:pointer;">
-                                          {preview_text}
-                                      </summary>
-                                      <div style="margin-top: 10px; color:#374151; line-height:1.6;">
-                                          {candidate["answer"]}
-                                      </div>
-                                  </details>
-                                  <div class="answer-score">Skor {candidate['score']:.4f}</div>
-                              </div>
-                          </div>
-                      """, unsafe_allow_html=True)
+        render_main_answer(snap.snippets.answer_html(best_idx), best_score,
+                           processing_time)
+        render_related(build_candidates(result, corpus_ans), best_answer,
+                       snap.snippets)
 
 
 
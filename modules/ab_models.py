@@ -0,0 +1,136 @@
+# ============================================================
+# 🆚 A/B MODEL — dua model registry pada query yang sama
+# ------------------------------------------------------------
+# Untuk tiap model: memori (RSS naik saat load model + store, ukuran
+# parameter & embedding), latency encode dan search (jalur serving:
+# LiveIndex + gated search coarse), Hit@1 / Recall@K terhadap jawaban
+# asli pertanyaan. Lalu kesepakatan A vs B: top-1 sama dan overlap@K
+# (dibandingkan lewat teks jawaban, karena urutan baris tiap store beda).
+#
+# Jalankan dari root repo (store kedua model harus sudah dibangun):
+#   python -m modules.ab_models --a e5-base --b e5-small --n 300
+# ============================================================
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from modules.dataset_io import read_dataset, resolve_dataset
+from modules.live_index import LiveIndex
+from modules.load_test import perturb, rss_mb
+from modules.model_registry import MODELS, encode, get_spec, query_text
+from modules.serving import COARSE_DIM
+from modules.store_meta import verify_manifest
+from modules.text_cleaning import normalize_query
+
+
+def percentile_ms(values, q):
+    return round(1000 * float(np.percentile(values, q)), 2)
+
+
+def run_model(key, queries, truth, k, coarse_dim):
+    from sentence_transformers import SentenceTransformer
+
+    spec = get_spec(key)
+    rss0 = rss_mb()
+    model = SentenceTransformer(spec["model_name"])
+    index = LiveIndex(spec["emb_file"], spec["delta_dir"],
+                      validate=lambda base: verify_manifest(
+                          base, spec["model_name"], spec["prefixes"],
+                          spec["normalization"]))
+    snap = index.snapshot()
+    rss1 = rss_mb()
+
+    # Warm-up supaya query pertama tidak menghitung inisialisasi torch
+    for q in queries[:5]:
+        encode(model, spec, query_text(spec, normalize_query(q)))
+
+    t_enc, t_search, top = [], [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        q_emb = encode(model, spec, query_text(spec, normalize_query(q)))
+        t1 = time.perf_counter()
+        result = snap.gated_search(q_emb, -1.0, k, coarse_dim=coarse_dim)
+        t2 = time.perf_counter()
+        t_enc.append(t1 - t0)
+        t_search.append(t2 - t1)
+        top.append([str(snap.answers[i]) for i, _ in result["hits"]])
+
+    hit1 = np.mean([bool(t) and t[0] == ans for t, ans in zip(top, truth)])
+    recall = np.mean([ans in t for t, ans in zip(top, truth)])
+    params_mb = sum(p.numel() * p.element_size() for p in model.parameters()) / 1e6
+
+    report = {
+        "model": spec["model_name"],
+        "dim": int(snap.base_emb.shape[1]),
+        "rows": len(snap),
+        "model_params_mb": round(params_mb, 1),
+        "embeddings_mb": round(snap.base_emb.nbytes / 1e6, 1),
+        "rss_load_mb": (round(rss1 - rss0, 1)
+                        if rss0 is not None and rss1 is not None else None),
+        "encode_p50_ms": percentile_ms(t_enc, 50),
+        "encode_p95_ms": percentile_ms(t_enc, 95),
+        "search_p50_ms": percentile_ms(t_search, 50),
+        "search_p95_ms": percentile_ms(t_search, 95),
+        "hit_at_1": round(float(hit1), 4),
+        f"recall_at_{k}": round(float(recall), 4),
+    }
+    return report, top
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A/B dua model embedding")
+    parser.add_argument("--a", choices=list(MODELS), default="e5-base")
+    parser.add_argument("--b", choices=list(MODELS), default="e5-small")
+    parser.add_argument("--n", type=int, default=300, help="Jumlah query")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--coarse-dim", type=int, default=COARSE_DIM,
+                        help="Default = serving.retrieve (0 = exact)")
+    parser.add_argument("--perturb", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-file", default=None)
+    parser.add_argument("--out", default=None, help="Simpan laporan JSON")
+    args = parser.parse_args()
+
+    # Query + jawaban aslinya dari dataset bersih
+    path = args.data_file or resolve_dataset("DATASET TANYA JAWAB CLEAN_QA.xlsx")
+    df = read_dataset(path, columns=["question", "answer"])
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(len(df), size=min(args.n, len(df)), replace=False)
+    queries = df["question"].astype(str).to_numpy()[rows].tolist()
+    truth   = df["answer"].astype(str).to_numpy()[rows].tolist()
+    if args.perturb:
+        import random
+        prng = random.Random(args.seed)
+        queries = [perturb(q, prng, args.perturb) for q in queries]
+
+    print(f"🆚 {args.a} vs {args.b} | {len(queries)} query | k={args.k}\n")
+    report_a, top_a = run_model(args.a, queries, truth, args.k, args.coarse_dim)
+    report_b, top_b = run_model(args.b, queries, truth, args.k, args.coarse_dim)
+
+    agree_top1 = np.mean([bool(a) and bool(b) and a[0] == b[0]
+                          for a, b in zip(top_a, top_b)])
+    overlap = np.mean([len(set(a) & set(b)) / args.k
+                       for a, b in zip(top_a, top_b)])
+
+    print(f"A = {report_a['model']}\nB = {report_b['model']}\n")
+    print(f"{'Metrik':<18} | {args.a:>14} | {args.b:>14} | {'Selisih':>9}")
+    print("-" * 64)
+    for name in list(report_a)[1:]:
+        va, vb = report_a[name], report_b[name]
+        diff = (f"{vb - va:+.3g}" if isinstance(va, (int, float))
+                and isinstance(vb, (int, float)) and not isinstance(va, bool)
+                else "")
+        print(f"{name:<18} | {str(va):>14} | {str(vb):>14} | {diff:>9}")
+    print(f"\nTop-1 sama        : {agree_top1:.3f}")
+    print(f"Overlap@{args.k:<10}: {overlap:.3f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"a": report_a, "b": report_b,
+                       "agreement_top1": round(float(agree_top1), 4),
+                       f"overlap_at_{args.k}": round(float(overlap), 4)},
+                      f, indent=2)
+        print(f"📁 Laporan: {args.out}")
@@ -0,0 +1,102 @@
+# ============================================================
+# ⏱ BENCHMARK — Coarse-to-fine (PCA shortlist) vs exact
+# Query = query_embeddings dari file embedding (tanpa model).
+# Pembanding serving: scan exact per cluster + early exit (default
+# serving.retrieve). Di akhir: setelan coarse tercepat yang recall@K
+# dan top-1-nya >= --min-recall, untuk MEDISEARCH_COARSE_DIM/SHORTLIST.
+# Jalankan dari root repo: python -m modules.bench_coarse
+# ============================================================
+
+import argparse
+import time
+
+import numpy as np
+
+from modules.coarse_search import coarse_to_fine
+from modules.live_index import LiveIndex
+from modules.similarity import blocked_topk
+from modules.store_meta import load_thresholds
+
+parser = argparse.ArgumentParser(description="Recall & latency coarse search")
+parser.add_argument("--emb-file", default="embeddings_all.npz")
+parser.add_argument("--dims", default="32,64,128,256")
+parser.add_argument("--shortlists", default="50,100,200,500")
+parser.add_argument("--k", type=int, default=10)
+parser.add_argument("--n-queries", type=int, default=500)
+parser.add_argument("--min-recall", type=float, default=0.99,
+                    help="Syarat recall@K & top-1 untuk rekomendasi coarse")
+args = parser.parse_args()
+
+data = np.load(args.emb_file, allow_pickle=True)
+corpus_emb     = data["corpus_embeddings"]
+corpus_coarse  = data["corpus_coarse"]
+pca_components = data["pca_components"]
+
+rng = np.random.default_rng(0)
+query_emb = data["query_embeddings"]
+query_emb = query_emb[rng.choice(len(query_emb),
+                                 min(args.n_queries, len(query_emb)),
+                                 replace=False)]
+K = args.k
+
+print(f"📄 Corpus: {corpus_emb.shape}, query: {len(query_emb)}, K={K}\n")
+
+# Ground truth: top-K exact
+truth, _ = blocked_topk(query_emb, corpus_emb, k=K)
+
+t0 = time.perf_counter()
+for q in query_emb:
+    s = corpus_emb @ q
+    top = np.argpartition(-s, K - 1)[:K]
+    top[np.argsort(-s[top])]
+exact_ms = 1000 * (time.perf_counter() - t0) / len(query_emb)
+
+print(f"{'Mode':<18} | {'Recall@' + str(K):>9} | {'Top-1':>6} | {'ms/query':>8} | {'Speedup':>7}")
+print("-" * 62)
+print(f"{'exact (768)':<18} | {1.0:>9.3f} | {1.0:>6.3f} | {exact_ms:>8.3f} | {1.0:>6.1f}x")
+
+
+def report(name, results, ms):
+    recall = np.mean([len(set(np.asarray(idx).tolist()) & set(gt.tolist())) / K
+                      for idx, gt in zip(results, truth)])
+    top1 = np.mean([len(idx) > 0 and idx[0] == gt[0]
+                    for idx, gt in zip(results, truth)])
+    print(f"{name:<18} | {recall:>9.3f} | {top1:>6.3f} | {ms:>8.3f} | {exact_ms / ms:>6.1f}x")
+    return recall, top1
+
+
+# Jalur serving default: cluster terdekat dulu, berhenti setelah K hit
+# >= threshold "high" (tanpa delta: hanya base yang dibandingkan)
+snap = LiveIndex(args.emb_file, delta_dir="").snapshot()
+high = load_thresholds(args.emb_file)["high"]
+t0 = time.perf_counter()
+results = [[i for i, _ in snap.gated_search(q, -1.0, K, high)["hits"]]
+           for q in query_emb]
+cluster_ms = 1000 * (time.perf_counter() - t0) / len(query_emb)
+report("cluster+exit", results, cluster_ms)
+
+candidates = []
+
+for dim in [int(x) for x in args.dims.split(",")]:
+    for size in [int(x) for x in args.shortlists.split(",")]:
+        t0 = time.perf_counter()
+        results = [
+            coarse_to_fine(corpus_emb, corpus_coarse, pca_components, q,
+                           k=K, dim=dim, shortlist_size=size)[0]
+            for q in query_emb
+        ]
+        ms = 1000 * (time.perf_counter() - t0) / len(query_emb)
+
+        recall, top1 = report(f"d={dim}, S={size}", results, ms)
+        if recall >= args.min_recall and top1 >= args.min_recall:
+            candidates.append((ms, dim, size, recall))
+
+print()
+fast = [c for c in candidates if c[0] < cluster_ms]
+if fast:
+    ms, dim, size, recall = min(fast)
+    print(f"✅ Rekomendasi: MEDISEARCH_COARSE_DIM={dim} MEDISEARCH_SHORTLIST={size} "
+          f"(recall@{K} {recall:.3f}, {cluster_ms / ms:.1f}x vs cluster+exit)")
+else:
+    print(f"ℹ️ Tidak ada setelan coarse dengan recall/top-1 >= {args.min_recall} "
+          "yang lebih cepat dari cluster+exit → biarkan MEDISEARCH_COARSE_DIM=0")
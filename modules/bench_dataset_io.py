@@ -0,0 +1,62 @@
+# ============================================================
+# ⏱ BENCHMARK — Excel vs Parquet vs Arrow (memory-mapped)
+# Jalankan dari root repo: python -m modules.bench_dataset_io
+# ============================================================
+
+import argparse
+import os
+import tempfile
+import time
+
+from modules.dataset_io import read_dataset, read_table, write_dataset
+
+
+def time_it(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+parser = argparse.ArgumentParser(description="Benchmark format dataset")
+parser.add_argument("--data", default="DATASET TANYA JAWAB CLEAN_QA.xlsx")
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+
+print(f"📄 Sumber: {args.data}")
+df = read_dataset(args.data)
+print(f"   Total baris: {len(df)}\n")
+
+with tempfile.TemporaryDirectory() as tmp:
+    paths = {
+        "parquet": os.path.join(tmp, "qa.parquet"),
+        "arrow":   os.path.join(tmp, "qa.arrow"),
+        "xlsx":    os.path.join(tmp, "qa.xlsx"),
+    }
+
+    write_times = {
+        fmt: time_it(lambda p=p: write_dataset(df, p), 1)
+        for fmt, p in paths.items()
+    }
+
+    cases = [
+        ("xlsx (pandas)",        lambda: read_dataset(paths["xlsx"])),
+        ("parquet (pandas)",     lambda: read_dataset(paths["parquet"])),
+        ("arrow (pandas)",       lambda: read_dataset(paths["arrow"])),
+        ("arrow (mmap, table)",  lambda: read_table(paths["arrow"])),
+    ]
+
+    print(f"{'Format':<22} | {'Baca (s)':>9} | {'Speedup':>8}")
+    print("-" * 45)
+    base = None
+    for name, fn in cases:
+        t = time_it(fn, args.repeat)
+        base = base or t
+        print(f"{name:<22} | {t:>9.4f} | {base / t:>7.1f}x")
+
+    print("\nTulis (s) / ukuran file:")
+    for fmt, p in paths.items():
+        size_kb = os.path.getsize(p) / 1024
+        print(f"  {fmt:<8} {write_times[fmt]:.4f} s  {size_kb:,.0f} KB")
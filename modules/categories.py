@@ -0,0 +1,198 @@
+# ============================================================
+# 🏷 KATEGORI — tag spesialisasi per pasangan QA (aturan kata kunci)
+# ------------------------------------------------------------
+# Aturan dijalankan pada teks BERSIH (hasil preprocessing.py):
+# pertanyaan + jawaban, huruf kecil, kata utuh (boleh akhiran -nya/-ku/-mu).
+# Satu QA boleh masuk beberapa kategori.
+#
+# Disimpan di store sebagai bitmap ringkas (np.packbits):
+#   category_names  (n_kategori,)             — key kategori
+#   category_bits   (n_kategori, ceil(n / 8)) — bit per baris corpus
+# Saat serving bitmap di-unpack sekali menjadi array indeks baris,
+# lalu filtered search hanya men-skor subset itu (fancy indexing).
+#
+# Tag ulang store tanpa encode ulang (setelah aturan diubah):
+#   python -m modules.categories [--model e5-small]
+# ============================================================
+
+import hashlib
+import json
+import re
+
+import numpy as np
+
+CATEGORY_RULES = {
+    "anak": {
+        "label": "Anak (Pediatri)",
+        "keywords": ["anak", "bayi", "balita", "batita", "imunisasi", "mpasi",
+                     "asi", "tumbuh kembang", "popok", "susu formula"],
+    },
+    "kulit": {
+        "label": "Kulit & Kelamin",
+        "keywords": ["kulit", "gatal", "jerawat", "ruam", "eksim", "panu",
+                     "kurap", "bisul", "kutil", "biduran", "psoriasis",
+                     "dermatitis", "komedo", "kudis", "herpes", "flek"],
+    },
+    "kandungan": {
+        "label": "Kandungan & Kebidanan",
+        "keywords": ["hamil", "kehamilan", "haid", "menstruasi", "keputihan",
+                     "rahim", "janin", "melahirkan", "persalinan", "keguguran",
+                     "ovarium", "miom", "kista", "vagina", "kontrasepsi", "kb",
+                     "promil", "ovulasi", "hpht"],
+    },
+    "gigi": {
+        "label": "Gigi & Mulut",
+        "keywords": ["gigi", "gusi", "karies", "behel", "sariawan",
+                     "karang gigi", "geraham"],
+    },
+    "mata": {
+        "label": "Mata",
+        "keywords": ["mata", "penglihatan", "rabun", "katarak", "kacamata",
+                     "belekan", "kelopak", "glaukoma", "silinder"],
+    },
+    "tht": {
+        "label": "THT",
+        "keywords": ["telinga", "hidung", "tenggorokan", "amandel", "tonsil",
+                     "sinusitis", "mimisan", "pilek", "polip", "suara serak"],
+    },
+    "jantung": {
+        "label": "Jantung & Pembuluh Darah",
+        "keywords": ["jantung", "hipertensi", "tekanan darah", "kolesterol",
+                     "berdebar", "nyeri dada", "darah tinggi", "varises"],
+    },
+    "pencernaan": {
+        "label": "Pencernaan",
+        "keywords": ["lambung", "maag", "perut", "diare", "sembelit", "mual",
+                     "muntah", "gerd", "asam lambung", "usus", "wasir",
+                     "ambeien", "bab", "ulu hati", "kembung", "liver", "tipes",
+                     "tifus"],
+    },
+    "saraf": {
+        "label": "Saraf",
+        "keywords": ["sakit kepala", "pusing", "migrain", "vertigo", "kejang",
+                     "saraf", "kesemutan", "stroke", "epilepsi", "kebas",
+                     "lumpuh"],
+    },
+    "jiwa": {
+        "label": "Kesehatan Jiwa",
+        "keywords": ["cemas", "kecemasan", "depresi", "stres", "stress",
+                     "panik", "insomnia", "susah tidur", "halusinasi",
+                     "bipolar", "psikolog", "psikiater", "overthinking"],
+    },
+    "paru": {
+        "label": "Paru & Pernapasan",
+        "keywords": ["batuk", "sesak", "asma", "paru", "tbc", "tuberkulosis",
+                     "bronkitis", "pneumonia", "dahak", "flu"],
+    },
+    "urologi": {
+        "label": "Ginjal & Saluran Kemih",
+        "keywords": ["kencing", "ginjal", "prostat", "buang air kecil",
+                     "kandung kemih", "anyang", "testis", "penis", "urin"],
+    },
+}
+
+
+def _compile(keywords):
+    alt = "|".join(re.escape(k).replace(r"\ ", r"\s+")
+                   for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alt})(?:nya|ku|mu)?\b")
+
+
+CATEGORY_PATTERNS = {key: _compile(rule["keywords"])
+                     for key, rule in CATEGORY_RULES.items()}
+
+
+def rules_id():
+    """Hash aturan; berubah → store perlu di-tag ulang."""
+    raw = json.dumps(CATEGORY_RULES, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def _match(text, keys):
+    text = str(text).lower()
+    return [bool(CATEGORY_PATTERNS[key].search(text)) for key in keys]
+
+
+def tag_texts(questions, answers, keys=None):
+    """Matriks bool (n, n_kategori).
+
+    Pertanyaan menentukan kategori; jawaban hanya dipakai bila pertanyaan
+    tidak cocok dengan aturan mana pun (jawaban sering menyebut hal umum
+    seperti "hindari stres" yang bukan topik pertanyaannya).
+    """
+    keys = list(keys or CATEGORY_RULES)
+    mask = np.zeros((len(questions), len(keys)), dtype=bool)
+    for i, (q, a) in enumerate(zip(questions, answers)):
+        row = _match(q, keys)
+        mask[i] = row if any(row) else _match(a, keys)
+    return mask
+
+
+def build_category_arrays(questions, answers):
+    """Array bitmap untuk disimpan bersama embedding."""
+    keys = list(CATEGORY_RULES)
+    mask = tag_texts(questions, answers, keys)
+    return {
+        "category_names": np.array(keys),
+        "category_bits": np.packbits(mask.T, axis=1),
+    }
+
+
+def category_rows(base, n_rows):
+    """{kategori: indeks baris (int64)} dari bitmap di store; {} bila tidak ada."""
+    if "category_bits" not in base:
+        return {}
+    bits = np.unpackbits(base["category_bits"], axis=1, count=n_rows)
+    return {str(name): np.flatnonzero(row)
+            for name, row in zip(base["category_names"], bits)}
+
+
+def category_label(key):
+    return CATEGORY_RULES.get(key, {}).get("label", key)
+
+
+def retag_store(emb_file):
+    """Hitung ulang bitmap kategori di store yang sudah ada (tanpa encode)."""
+    from modules.store_meta import (
+        MANIFEST_KEY, build_manifest, get_manifest, lineage_id, save_store,
+        store_lock,
+    )
+
+    # Baca-ubah-tulis di bawah lock: compaction tidak boleh menyela
+    with store_lock(emb_file):
+        with np.load(emb_file, allow_pickle=True) as data:
+            arrays = {key: data[key] for key in data.files if key != MANIFEST_KEY}
+            old = get_manifest(data)
+
+        arrays.update(build_category_arrays(arrays["questions"], arrays["answers"]))
+        manifest = None
+        if old is not None:
+            manifest = build_manifest(
+                arrays, old["model_name"],
+                # Skor tidak berubah → kalibrasi tetap terikat (lineage)
+                dict(old["inputs"], category_rules=rules_id(),
+                     lineage_id=lineage_id(old)),
+                old["prefixes"], old["normalization"])
+        save_store(emb_file, arrays, manifest)
+    return arrays
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from modules.model_registry import add_model_arg, get_spec
+
+    parser = argparse.ArgumentParser(description="Tag ulang kategori di store")
+    add_model_arg(parser)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    emb_file = get_spec(args.model)["emb_file"]
+    arrays = retag_store(emb_file)
+    n = len(arrays["corpus_embeddings"])
+    for key, rows in category_rows(arrays, n).items():
+        print(f"  {category_label(key):<28} {len(rows):>6} baris "
+              f"({100 * len(rows) / n:.1f}%)")
+    print(f"✅ Kategori disimpan ke {emb_file} (aturan {rules_id()})")
+    print(f"⏱ Waktu: {round(time.time() - start_time, 2)} detik")
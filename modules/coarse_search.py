@@ -0,0 +1,64 @@
+# ============================================================
+# 🎯 COARSE-TO-FINE SEARCH — PCA (Matryoshka-style) shortlist
+# ------------------------------------------------------------
+# Build (embedding_model.py):
+#   pca_mean, pca_components (MAX_DIM × 768), corpus_coarse (N × MAX_DIM)
+# Query:
+#   1) skor kasar di d dimensi pertama PCA (d ≤ MAX_DIM, bisa diatur)
+#   2) shortlist S kandidat teratas
+#   3) hanya shortlist yang di-rescore dengan vektor penuh
+# Komponen PCA terurut menurut varians, jadi memotong ke d dimensi
+# pertama tetap proyeksi terbaik untuk d tersebut.
+# ============================================================
+
+import numpy as np
+
+MAX_DIM = 256
+
+
+def fit_pca(emb, n_components=MAX_DIM):
+    """PCA via eigen-dekomposisi kovarians (dim × dim, tidak N × N)."""
+    X = np.asarray(emb, dtype=np.float64)
+    mean = X.mean(axis=0)
+    Xc = X - mean
+    cov = Xc.T @ Xc / max(len(X) - 1, 1)
+    eigvals, eigvecs = np.linalg.eigh(cov)
+    order = np.argsort(eigvals)[::-1][:n_components]
+    return mean.astype(np.float32), eigvecs[:, order].T.astype(np.float32)
+
+
+def project(emb, mean, components):
+    """Proyeksi corpus ke ruang PCA (float32)."""
+    return ((np.asarray(emb, dtype=np.float32) - mean) @ components.T).astype(
+        np.float32)
+
+
+def coarse_scores(corpus_coarse, components, q_emb, dim):
+    """Skor kasar yang sebanding (ranking) dengan dot(corpus, q).
+
+    dot(C, q) = dot(C - mean, q) + dot(mean, q); suku kedua konstan per
+    query sehingga diabaikan, dan (C - mean) ≈ corpus_coarse @ components.
+    """
+    q_coarse = components[:dim] @ q_emb
+    return corpus_coarse[:, :dim] @ q_coarse
+
+
+def shortlist(corpus_coarse, components, q_emb, dim, size):
+    """Indeks `size` kandidat teratas menurut skor kasar, terurut menurun."""
+    s = coarse_scores(corpus_coarse, components, q_emb, dim)
+    size = min(size, len(s))
+    top = np.argpartition(-s, size - 1)[:size]
+    return top[np.argsort(-s[top])]
+
+
+def coarse_to_fine(corpus, corpus_coarse, components, q_emb, k, dim=128,
+                   shortlist_size=200):
+    """Top-k hasil rescore vektor penuh atas shortlist PCA.
+
+    Returns:
+        (indices, scores) terurut menurun.
+    """
+    rows = shortlist(corpus_coarse, components, q_emb, dim, shortlist_size)
+    s = corpus[rows] @ q_emb
+    order = np.argsort(-s)[:k]
+    return rows[order], s[order]
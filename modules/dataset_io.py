@@ -0,0 +1,80 @@
+# ============================================================
+# 📦 DATASET I/O — Parquet / Arrow sebagai format utama
+# ------------------------------------------------------------
+# Format antar tahap (preprocessing → embedding → serving):
+#   .parquet          → default, kolumnar + terkompresi
+#   .arrow / .feather → Arrow IPC tanpa kompresi, bisa di-memory-map
+#                       (zero-copy) lewat read_table(..., memory_map=True)
+#   .xlsx / .xls      → HANYA adapter import/export (openpyxl lambat)
+# ============================================================
+
+import os
+
+import pandas as pd
+
+PARQUET_EXT = (".parquet",)
+ARROW_EXT   = (".arrow", ".feather")
+EXCEL_EXT   = (".xlsx", ".xls")
+
+
+def _ext(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def read_table(path, columns=None, memory_map=True):
+    """Baca dataset sebagai pyarrow.Table.
+
+    Untuk file Arrow IPC dengan memory_map=True, buffer kolom menunjuk
+    langsung ke halaman file (zero-copy); hanya dibaca saat disentuh.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    ext = _ext(path)
+    if ext in ARROW_EXT:
+        source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+    if ext in PARQUET_EXT:
+        return pq.read_table(path, columns=columns, memory_map=memory_map)
+    if ext in EXCEL_EXT:
+        return pa.Table.from_pandas(read_dataset(path, columns=columns),
+                                    preserve_index=False)
+    raise ValueError(f"Format dataset tidak dikenal: '{path}'")
+
+
+def read_dataset(path, columns=None, memory_map=True):
+    """Baca dataset sebagai DataFrame sesuai ekstensi file."""
+    ext = _ext(path)
+    if ext in EXCEL_EXT:
+        df = pd.read_excel(path)
+        return df[columns] if columns else df
+    return read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+
+
+def write_dataset(df, path):
+    """Tulis DataFrame sesuai ekstensi (atomik: tmp → os.replace)."""
+    ext = _ext(path)
+    tmp_path = f"{path}.tmp{ext}"
+
+    if ext in PARQUET_EXT:
+        df.to_parquet(tmp_path, index=False)
+    elif ext in ARROW_EXT:
+        import pyarrow.feather as feather
+        # Tanpa kompresi agar bisa di-memory-map zero-copy
+        feather.write_feather(df.reset_index(drop=True), tmp_path,
+                              compression="uncompressed")
+    elif ext in EXCEL_EXT:
+        df.to_excel(tmp_path, index=False)
+    else:
+        raise ValueError(f"Format dataset tidak dikenal: '{path}'")
+
+    os.replace(tmp_path, path)
+
+
+def resolve_dataset(path):
+    """Pakai versi Parquet bila ada; kalau tidak, file aslinya (mis. .xlsx)."""
+    parquet_path = os.path.splitext(path)[0] + PARQUET_EXT[0]
+    if os.path.exists(parquet_path):
+        return parquet_path
+    return path
@@ -1,12 +1,55 @@
 # ============================================================
 # 🔥 FINAL — Generate E5 Embedding (CORPUS + QUERY in 1 FILE)
+# Jalankan dari root repo: python -m modules.embedding_model [--model e5-small]
 # ============================================================
 
-import pandas as pd
+import argparse
+import sys
 import numpy as np
 import time
 from sentence_transformers import SentenceTransformer
-from sklearn.preprocessing import normalize
+
+from modules.dataset_io import read_dataset, resolve_dataset
+from modules.live_index import missing_segments, restore_archived
+from modules.categories import build_category_arrays, retag_store, rules_id
+from modules.coarse_search import MAX_DIM, fit_pca, project
+from modules.model_registry import add_model_arg, get_spec
+from modules.profiling import StageProfiler
+from modules.similarity import cluster_order
+from modules.snippets import PREVIEW_CHARS, build_snippet_arrays
+from modules.store_meta import (
+    StoreMismatchError, build_manifest, dataset_fingerprint, read_manifest,
+    save_store, store_lock, verify_manifest,
+)
+from modules.token_stats import (
+    TokenCache, encode_from_ids, estimate_encode_seconds, token_report,
+)
+
+parser = argparse.ArgumentParser(description="Bangun embedding E5")
+parser.add_argument("--long-text", choices=["truncate", "chunk"],
+                    default="truncate",
+                    help="Teks > max_seq_length: potong, atau rata-rata per chunk")
+parser.add_argument("--token-cache", default=None,
+                    help="File cache token ID (default per model, '' = mati)")
+parser.add_argument("--token-report", default="token_report.txt")
+parser.add_argument("--profile", action="store_true",
+                    help="Profil per tahap (CPU, memori, hotspot)")
+parser.add_argument("--profile-out", default="profile_embedding.txt")
+parser.add_argument("--force", action="store_true",
+                    help="Bangun ulang walau dataset & konfigurasi sama")
+add_model_arg(parser)
+args = parser.parse_args()
+
+SPEC       = get_spec(args.model)        # modules/model_registry.py
+MODEL_NAME = SPEC["model_name"]
+PREFIXES   = SPEC["prefixes"]
+N_CLUSTERS = 64
+OUT_FILE   = SPEC["emb_file"]
+if args.token_cache is None:
+    args.token_cache = SPEC["token_cache"]
+
+# prof.begin(...) otomatis menutup tahap sebelumnya
+prof = StageProfiler(enabled=args.profile)
 
 start_time = time.time()
 print("🚀 Memulai proses embedding E5 untuk CORPUS + QUERY...\n")
@@ -14,74 +57,195 @@ print("🚀 Memulai proses embedding E5 untuk CORPUS + QUERY...\n")
 # ------------------------------------------------------------
 # 1) Load Data
 # ------------------------------------------------------------
-DATA_FILE = "DATASET TANYA JAWAB CLEAN_QA.xlsx"
+# Parquet dari preprocessing.py; fallback ke Excel lama bila belum ada
+DATA_FILE = resolve_dataset("DATASET TANYA JAWAB CLEAN_QA.xlsx")
 
-df = pd.read_excel(DATA_FILE)
+prof.begin("load_data")
+df = read_dataset(DATA_FILE, columns=["question", "answer"])
 questions = df["question"].astype(str).tolist()
 answers   = df["answer"].astype(str).tolist()
 
-print(f"📄 Total pasangan Q–A: {len(df)}\n")
+print(f"📄 Total pasangan Q–A: {len(df)} ({DATA_FILE})\n")
+
+# Semua yang memengaruhi isi store; sama → build dilewati
+inputs = {
+    "dataset_sha256": dataset_fingerprint(questions, answers),
+    "long_text":  args.long_text,
+    "n_clusters": N_CLUSTERS,
+    "pca_dim":    MAX_DIM,
+    "preview_chars": PREVIEW_CHARS,
+    "category_rules": rules_id(),
+}
+# Aturan kategori saja yang berubah → cukup tag ulang, tanpa encode.
+# lineage_id (tag ulang) dan compacted_from (compaction LiveIndex)
+# bukan input build: store hasil compaction tetap dianggap up to date.
+without_rules = lambda d: {k: v for k, v in d.items() if k not in
+                           ("category_rules", "lineage_id", "compacted_from")}
+old = read_manifest(OUT_FILE)
+if (not args.force and old is not None
+        and without_rules(old["inputs"]) == without_rules(inputs)
+        and old["model_name"] == MODEL_NAME and old["prefixes"] == PREFIXES):
+    try:
+        with np.load(OUT_FILE, allow_pickle=True) as data:
+            verify_manifest(data, MODEL_NAME, PREFIXES, SPEC["normalization"])
+        if old["inputs"].get("category_rules") != inputs["category_rules"]:
+            retag_store(OUT_FILE)
+            print(f"🏷 Aturan kategori berubah → {OUT_FILE} di-tag ulang "
+                  f"(aturan {inputs['category_rules']}).")
+        else:
+            print(f"✅ {OUT_FILE} sudah up to date (store {old['store_id']}, "
+                  f"dibangun {old['built_at']}). Pakai --force untuk build ulang.")
+        sys.exit(0)
+    except StoreMismatchError as e:
+        print(f"⚠️ {e} → build ulang\n")
+
+# Base hasil compaction berisi QA tambahan (live_index add). Segmennya
+# diarsip dan dikembalikan saat menulis base baru; bila arsip hilang
+# (compaction versi lama menghapusnya) build ulang membuang QA itu.
+if old is not None and old["inputs"].get("compacted_from"):
+    lost = missing_segments(OUT_FILE, SPEC["delta_dir"])
+    if lost:
+        print(f"⚠️ {OUT_FILE} berisi {len(lost)} segmen delta hasil compaction "
+              f"yang arsipnya tidak ada di {SPEC['delta_dir']}/. Build ulang "
+              "akan MENGHAPUS QA tambahan itu dari store.")
+        if not args.force:
+            print("   Tambahkan ulang datanya (python -m modules.live_index add), "
+                  "atau pakai --force untuk tetap build ulang.")
+            sys.exit(1)
 
 # ------------------------------------------------------------
 # 2) Load E5 Model
 # ------------------------------------------------------------
-MODEL_NAME = "intfloat/multilingual-e5-base"
 print(f"🔍 Memuat model: {MODEL_NAME}\n")
+prof.begin("load_model")
 model = SentenceTransformer(MODEL_NAME)
 
 # ------------------------------------------------------------
-# 3) Embedding ANSWER → Corpus utama (passage)
+# 3) Pre-pass tokenisasi (cache) + statistik token
 # ------------------------------------------------------------
-print("🔧 Menghasilkan embedding ANSWER sebagai PASSAGE...")
+print("🔤 Tokenisasi ANSWER + QUESTION...")
+prof.begin("tokenize")
 
-answers_prefixed = ["passage: " + a for a in answers]
+answers_prefixed   = [PREFIXES["passage"] + a for a in answers]
+questions_prefixed = [PREFIXES["query"] + q for q in questions]
 
-corpus_embeddings = model.encode(
-    answers_prefixed,
-    convert_to_numpy=True,
-    show_progress_bar=True
-)
+cache = TokenCache(args.token_cache or "", MODEL_NAME)
+answer_ids   = cache.tokenize(model.tokenizer, answers_prefixed)
+question_ids = cache.tokenize(model.tokenizer, questions_prefixed)
+print(f"   Cache token: {cache.hits} hit, {cache.misses} miss")
+if args.token_cache:
+    cache.save()
 
-# NORMALISASI L2
-corpus_embeddings = normalize(corpus_embeddings, norm="l2", axis=1)
+answer_token_counts   = np.array([len(x) for x in answer_ids], dtype=np.int32)
+question_token_counts = np.array([len(x) for x in question_ids], dtype=np.int32)
+
+prof.begin("token_report")
+max_len = model.max_seq_length
+report = "\n\n".join([
+    token_report("ANSWER", answer_token_counts, max_len,
+                 estimate_encode_seconds(model, answer_ids)),
+    token_report("QUESTION", question_token_counts, max_len,
+                 estimate_encode_seconds(model, question_ids)),
+])
+print(report)
+with open(args.token_report, "w", encoding="utf-8") as f:
+    f.write(report + "\n")
 
 # ------------------------------------------------------------
-# 4) Embedding QUESTION → Query
+# 4) Embedding ANSWER → Corpus utama (passage)
 # ------------------------------------------------------------
-print("\n🔧 Menghasilkan embedding QUESTION sebagai QUERY...")
+print(f"\n🔧 Menghasilkan embedding ANSWER sebagai PASSAGE ({args.long_text})...")
 
-questions_prefixed = ["query: " + q for q in questions]
+prof.begin("encode_answers")
+# Langsung dari token ID (tanpa tokenisasi ulang), sudah NORMALISASI L2
+corpus_embeddings = encode_from_ids(
+    model, answer_ids, long_text=args.long_text, show_progress_bar=True
+)
 
-query_embeddings = model.encode(
-    questions_prefixed,
-    convert_to_numpy=True,
-    show_progress_bar=True
+# ------------------------------------------------------------
+# 5) Embedding QUESTION → Query
+# ------------------------------------------------------------
+print("\n🔧 Menghasilkan embedding QUESTION sebagai QUERY...")
+
+prof.begin("encode_questions")
+query_embeddings = encode_from_ids(
+    model, question_ids, long_text=args.long_text, show_progress_bar=True
 )
 
-query_embeddings = normalize(query_embeddings, norm="l2", axis=1)
+# ------------------------------------------------------------
+# 6) Urutkan corpus per cluster (untuk early exit saat serving)
+# ------------------------------------------------------------
+print(f"\n🧩 Mengurutkan corpus ke {N_CLUSTERS} cluster...")
+prof.begin("cluster_order")
+perm, cluster_offsets, cluster_centroids = cluster_order(
+    corpus_embeddings, N_CLUSTERS
+)
+corpus_embeddings = corpus_embeddings[perm]
+query_embeddings  = query_embeddings[perm]
+answers   = [answers[i] for i in perm]
+questions = [questions[i] for i in perm]
+answer_token_counts   = answer_token_counts[perm]
+question_token_counts = question_token_counts[perm]
 
 # ------------------------------------------------------------
-# 5) Simpan semua dalam satu file .npz
+# 7) PCA untuk coarse search (dimensi terurut menurut varians)
 # ------------------------------------------------------------
-OUT_FILE = "embeddings_all.npz"
+print(f"\n📉 Fit PCA {MAX_DIM} dimensi untuk coarse search...")
+prof.begin("pca")
+pca_mean, pca_components = fit_pca(corpus_embeddings, MAX_DIM)
+corpus_coarse = project(corpus_embeddings, pca_mean, pca_components)
 
-np.savez(
-    OUT_FILE,
-    corpus_embeddings = corpus_embeddings,  
-    query_embeddings  = query_embeddings,   
+# ------------------------------------------------------------
+# 8) Simpan semua dalam satu file .npz
+# ------------------------------------------------------------
+prof.begin("save")
+arrays = dict(
+    corpus_embeddings = corpus_embeddings,
+    query_embeddings  = query_embeddings,
     answers           = np.array(answers, dtype=object),
     questions         = np.array(questions, dtype=object),
+    cluster_offsets   = cluster_offsets,
+    cluster_centroids = cluster_centroids,
+    answer_token_counts   = answer_token_counts,
+    question_token_counts = question_token_counts,
+    pca_mean          = pca_mean,
+    pca_components    = pca_components,
+    corpus_coarse     = corpus_coarse,
+    # Preview + HTML ter-escape per jawaban (lookup saat render)
+    **build_snippet_arrays(answers),
+    # Bitmap kategori spesialisasi (filtered search)
+    **build_category_arrays(questions, answers),
 )
+# Manifest ikut di dalam file; tulis ke tmp lalu os.replace (atomik)
+manifest = build_manifest(arrays, MODEL_NAME, inputs, PREFIXES,
+                          SPEC["normalization"])
+with store_lock(OUT_FILE):  # jangan balapan dengan compaction LiveIndex
+    # Segmen yang pernah di-compact kembali jadi delta (sebelum base baru
+    # ditulis: base lama masih mengabaikannya lewat compacted_segments)
+    restored = restore_archived(SPEC["delta_dir"])
+    save_store(OUT_FILE, arrays, manifest)
+
+prof.end()
 
 print(f"\n✅ Semua EMBEDDING disimpan ke: {OUT_FILE}")
+if restored:
+    print(f"   ({len(restored)} segmen delta hasil compaction dikembalikan ke "
+          f"{SPEC['delta_dir']}/)")
 print("   - corpus_embeddings (passage = jawaban)")
 print("   - query_embeddings  (query = pertanyaan)")
 print("   - answers (teks jawaban)")
 print("   - questions (teks pertanyaan)")
+print("   - cluster_offsets / cluster_centroids (urutan cluster)")
+print("   - answer_token_counts / question_token_counts (jumlah token)")
+print("   - pca_mean / pca_components / corpus_coarse (coarse search)")
+print("   - answers_html / answers_html_offsets / answers_preview_end (snippet)")
+print("   - category_names / category_bits (bitmap kategori)")
+print(f"   - manifest (store {manifest['store_id']}, {manifest['n_rows']} baris, "
+      f"{manifest['dim']} dim, {manifest['dtype']})")
 
 
 # ============================================================
-# 6) PREVIEW 5 HASIL EMBEDDING (untuk laporan / artikel)
+# 9) PREVIEW 5 HASIL EMBEDDING (untuk laporan / artikel)
 # ============================================================
 
 print("\n\n================= 🟢 SAMPLE 5 QUERY EMBEDDINGS (QUESTION) =================")
@@ -97,7 +261,13 @@ for i in range(5):
     print("5 dimensi pertama:", corpus_embeddings[i][:5])
 
 # ------------------------------------------------------------
-# 7) Summary
+# 10) Summary
 # ------------------------------------------------------------
+if args.profile:
+    prof.write_report(args.profile_out)
+    print("\n" + prof.summary())
+    print(f"🔬 Laporan profil: {args.profile_out}")
+
 print("\n🎉 Selesai membuat embedding E5 (CORPUS + QUERY)!")
+print(f"   Store baru → jalankan ulang: python -m modules.kalibrasi --model {SPEC['key']}")
 print(f"⏱ Total waktu: {round(time.time() - start_time, 2)} detik")
@@ -1,38 +1,101 @@
 # =============================================================
 # PRECISION@K versi proporsional + TAMPILKAN TEKS QUERY
+# Jalankan dari root repo: python -m modules.evaluasi [--coarse-dim 128]
+# Bandingkan dengan pseudo-relevance feedback: --prf 3 --n-sample 500
+#   (hanya query <= --prf-max-words kata, gerbang sama dengan serving)
 # =============================================================
 
+import argparse
+import os
+import time
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
-MODEL_NAME = "intfloat/multilingual-e5-base"
-EMB_FILE   = "embeddings_all.npz"
+from modules.coarse_search import coarse_to_fine
+from modules.model_registry import (
+    add_model_arg, encode as encode_texts, get_spec, query_text,
+)
+from modules.query_expansion import PRF_BETA, prf_applies, rocchio
+from modules.store_meta import load_thresholds, verify_manifest
+from modules.text_cleaning import normalize_query
+
+parser = argparse.ArgumentParser(description="Evaluasi Precision@K")
+parser.add_argument("--coarse-dim", type=int, default=0,
+                    help="Dimensi PCA untuk shortlist (0 = exact)")
+parser.add_argument("--shortlist", type=int, default=200)
+parser.add_argument("--prf", type=int, default=0,
+                    help="Jumlah dokumen feedback Rocchio (0 = tanpa PRF)")
+parser.add_argument("--prf-beta", type=float, default=PRF_BETA)
+parser.add_argument("--prf-max-words", type=int,
+                    default=int(os.environ.get("MEDISEARCH_PRF_MAX_WORDS") or 5),
+                    help="PRF hanya untuk query <= N kata "
+                         "(gerbang serving, MEDISEARCH_PRF_MAX_WORDS)")
+parser.add_argument("--n-sample", type=int, default=None,
+                    help="Jumlah query untuk rata-rata (default N_SAMPLE)")
+add_model_arg(parser)
+args = parser.parse_args()
+
+SPEC       = get_spec(args.model)
+MODEL_NAME = SPEC["model_name"]
+EMB_FILE   = SPEC["emb_file"]
 
 print("Loading model & embeddings...")
 model = SentenceTransformer(MODEL_NAME)
 data = np.load(EMB_FILE, allow_pickle=True)
+verify_manifest(data, MODEL_NAME, SPEC["prefixes"], SPEC["normalization"])
 
 corpus_emb = data["corpus_embeddings"]
 questions  = data["questions"]
+answers    = data["answers"]
+
+if args.coarse_dim:
+    corpus_coarse  = data["corpus_coarse"]
+    pca_components = data["pca_components"]
 
 # K seperti tabel skripsi
 K_LIST = [5, 10, 15, 20, 25]
 
-# Threshold relevansi
-THRESHOLD = 0.85
+# Threshold relevansi (terkalibrasi bila ada, default 0.85)
+THRESHOLD = load_thresholds(EMB_FILE)["relevant"]
 
 # Sampel yang ditampilkan
 N_SAMPLE = 5
 
-def retrieve(question):
-    q = "query: " + question
-    q_emb = model.encode(q, convert_to_numpy=True, normalize_embeddings=True)
+def encode(question):
+    return encode_texts(model, SPEC, query_text(SPEC, question))
+
+
+def search(q_emb):
+    """Return (ranked, scores) — skor sudah terurut mengikuti ranked."""
+    if args.coarse_dim:
+        return coarse_to_fine(
+            corpus_emb, corpus_coarse, pca_components, q_emb,
+            k=max(K_LIST), dim=args.coarse_dim, shortlist_size=args.shortlist,
+        )
 
     scores = np.dot(corpus_emb, q_emb)
     ranked = scores.argsort()[::-1]
-    return ranked, scores
+    return ranked, scores[ranked]
+
+
+def search_prf(q_emb):
+    """Rocchio: cari, geser q ke centroid top-m, cari ulang.
+
+    Skor dilaporkan terhadap query asli (THRESHOLD tetap bermakna).
+    """
+    ranked, _ = search(q_emb)
+    refined = rocchio(q_emb, corpus_emb[ranked[:args.prf]], beta=args.prf_beta)
+    ranked, _ = search(refined)
+    ranked = ranked[:max(K_LIST)]
+    return ranked, corpus_emb[ranked] @ q_emb
 
 
+def precision_row(scores):
+    return [round(np.sum(scores[:K] >= THRESHOLD) / K, 2) for K in K_LIST]
+
+
+n_eval = args.n_sample or N_SAMPLE
+
 print("\n==================== Precision@K ====================\n")
 
 # Header tabel: tambah kolom Query Text
@@ -40,28 +103,54 @@ header = f"{'No':<3} | {'Query Text':<40} | " + " | ".join([f"P@{k}" for k in K_
 print(header)
 print("-" * len(header))
 
-table = []
+table, table_prf = [], []
+hit1, hit1_prf = [], []
+lat, lat_prf = [], []
+prf_rows = []  # indeks query yang lolos gerbang PRF
 
-for i in range(N_SAMPLE):
-    q_text = questions[i][:40].replace("\n", " ")  # potong 40 char untuk rapi
+for i in range(n_eval):
+    q_emb = encode(questions[i])
 
-    ranked, scores = retrieve(questions[i])
-    row_scores = []
-
-    for K in K_LIST:
-        top_scores = scores[ranked[:K]]
-        num_rel = np.sum(top_scores >= THRESHOLD)
-        row_scores.append(round(num_rel / K, 2))
+    t0 = time.perf_counter()
+    ranked, scores = search(q_emb)
+    lat.append(time.perf_counter() - t0)
 
+    row_scores = precision_row(scores)
     table.append(row_scores)
-
-    # Print tabel dengan teks query
-    row_str = f"{i+1:<3} | {q_text:<40} | " + " | ".join([f"{p:<4}" for p in row_scores])
-    print(row_str)
+    hit1.append(answers[ranked[0]] == answers[i])  # jawaban asli pertanyaan ini
+
+    if args.prf and prf_applies(normalize_query(questions[i]), args.prf_max_words):
+        prf_rows.append(i)
+        t0 = time.perf_counter()
+        ranked_p, scores_p = search_prf(q_emb)
+        lat_prf.append(time.perf_counter() - t0)
+        table_prf.append(precision_row(scores_p))
+        hit1_prf.append(answers[ranked_p[0]] == answers[i])
+
+    if i < N_SAMPLE:
+        # Print tabel dengan teks query (potong 40 char untuk rapi)
+        q_text = questions[i][:40].replace("\n", " ")
+        row_str = f"{i+1:<3} | {q_text:<40} | " + " | ".join([f"{p:<4}" for p in row_scores])
+        print(row_str)
 
 # Rata-rata
 avg = np.mean(table, axis=0)
 
-print("\nRata-rata:")
+print(f"\nRata-rata ({n_eval} query):")
 for k, v in zip(K_LIST, avg):
     print(f"P@{k}: {round(v, 2)}")
+
+if args.prf:
+    # Bandingkan hanya populasi yang di serving memang kena PRF
+    print(f"\n============ PRF (m={args.prf}, beta={args.prf_beta}) vs tanpa PRF ============")
+    print(f"Query <= {args.prf_max_words} kata: {len(prf_rows)} dari {n_eval}")
+    if prf_rows:
+        avg_base = np.mean([table[i] for i in prf_rows], axis=0)
+        avg_prf = np.mean(table_prf, axis=0)
+        hit1_base = np.mean([hit1[i] for i in prf_rows])
+        for k, v, vp in zip(K_LIST, avg_base, avg_prf):
+            print(f"P@{k:<3}: {v:.3f} → {vp:.3f}  ({vp - v:+.3f})")
+        print(f"Hit@1 : {hit1_base:.3f} → {np.mean(hit1_prf):.3f}  "
+              f"({np.mean(hit1_prf) - hit1_base:+.3f})")
+        print(f"Latency search: {1000 * np.mean([lat[i] for i in prf_rows]):.2f} ms → "
+              f"{1000 * np.mean(lat_prf):.2f} ms per query (tanpa encode)")
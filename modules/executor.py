@@ -0,0 +1,195 @@
+# ============================================================
+# 🧵 EXECUTOR — retrieval di thread pool terbatas
+# ------------------------------------------------------------
+# Setiap sesi Streamlit menjalankan script di thread-nya sendiri; tanpa
+# batas, N user = N encode torch bersamaan yang saling berebut thread
+# intra-op (oversubscription) dan semuanya melambat. Executor ini:
+#   - membatasi retrieval paralel ke max_workers thread,
+#   - mengatur thread intra-op torch (workers × intra_op ≈ jumlah core),
+#   - antrean terbatas (queue_size): penuh → Overloaded (backpressure),
+#   - timeout per request → RequestTimeout.
+#
+# Simulasi N user bersamaan (throughput + latency):
+#   python -m modules.executor --users 8 --requests 20 --workers 2
+# ============================================================
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import numpy as np
+
+
+class Overloaded(RuntimeError):
+    """Antrean penuh — request ditolak (backpressure)."""
+
+
+class RequestTimeout(TimeoutError):
+    """Request tidak selesai dalam batas waktu."""
+
+
+def set_intra_op_threads(n):
+    """Batasi thread intra-op torch (global per proses)."""
+    if not n:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(int(n))
+
+
+class RetrievalExecutor:
+    def __init__(self, max_workers=2, queue_size=16, intra_op_threads=None,
+                 timeout=10.0):
+        if intra_op_threads is None:
+            intra_op_threads = max(1, (os.cpu_count() or 1) // max_workers)
+        set_intra_op_threads(intra_op_threads)
+
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.intra_op_threads = intra_op_threads
+        self.timeout = timeout
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="retrieval")
+        # Slot = sedang jalan + menunggu; dilepas saat task SELESAI
+        # (task yang timeout tetap memegang slot sampai benar-benar selesai)
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._stats_lock = threading.Lock()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0,
+                      "rejected": 0, "timed_out": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def submit(self, fn, *args, wait=0.0, **kwargs):
+        """Masukkan ke antrean; Overloaded bila penuh setelah `wait` detik."""
+        acquired = (self._slots.acquire(timeout=wait) if wait
+                    else self._slots.acquire(blocking=False))
+        if not acquired:
+            self._count("rejected")
+            raise Overloaded(f"Antrean penuh ({self.max_workers} worker + "
+                             f"{self.queue_size} antre)")
+        self._count("submitted")
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        def done(f):
+            self._slots.release()
+            if not f.cancelled():  # cancel = sudah dihitung timed_out
+                self._count("failed" if f.exception() else "completed")
+        future.add_done_callback(done)
+        return future
+
+    def run(self, fn, *args, timeout=None, wait=0.0, **kwargs):
+        """submit() lalu tunggu hasilnya (maks timeout detik)."""
+        future = self.submit(fn, *args, wait=wait, **kwargs)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()  # hanya berhasil bila belum mulai jalan
+            self._count("timed_out")
+            raise RequestTimeout(f"Retrieval > {timeout} detik") from None
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# ============================================================
+# Simulasi N user bersamaan
+# ============================================================
+def simulate_users(call, queries, n_users, requests_per_user):
+    """Tiap user mengirim request berurutan (closed loop).
+
+    call(query) → apa saja; exception dihitung per jenis.
+    Return dict throughput + persentil latency (ms).
+    """
+    latencies, errors = [], {}
+    lock = threading.Lock()
+
+    def user(uid):
+        for r in range(requests_per_user):
+            query = queries[(uid * requests_per_user + r) % len(queries)]
+            t0 = time.perf_counter()
+            try:
+                call(query)
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    threads = [threading.Thread(target=user, args=(u,)) for u in range(n_users)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat_ms = 1000 * np.array(latencies) if latencies else np.zeros(1)
+    return {
+        "users": n_users,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(lat_ms, 95)), 1),
+        "max_ms": round(float(lat_ms.max()), 1),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from modules import serving
+    from modules.model_registry import add_model_arg
+
+    parser = argparse.ArgumentParser(description="Simulasi N user bersamaan")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20,
+                        help="Request per user")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--intra-op", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--direct", action="store_true",
+                        help="Bandingkan juga tanpa executor (semua paralel)")
+    add_model_arg(parser)
+    args = parser.parse_args()
+
+    snap = serving.get_index(args.model).snapshot()
+    queries = [str(snap.questions[i]) for i in range(min(500, len(snap)))]
+    # Threshold sama dengan app.py/POST /search (termasuk early exit
+    # HIGH_CONFIDENCE); hard-code 0.85 membuat beban load test tidak realistis
+    thresholds = serving.get_thresholds(args.model)
+
+    def retrieve(query):
+        return serving.retrieve(query, thresholds["relevant"], 6,
+                                thresholds["high"], model=args.model)[0]
+
+    serving.warm_up_replica(rounds=1)
+
+    if args.direct:
+        print("Tanpa executor:",
+              json.dumps(simulate_users(retrieve, queries, args.users,
+                                        args.requests)))
+
+    executor = RetrievalExecutor(args.workers, args.queue, args.intra_op,
+                                 args.timeout)
+    report = simulate_users(lambda q: executor.run(retrieve, q, wait=args.timeout),
+                            queries, args.users, args.requests)
+    report.update(workers=args.workers, intra_op=executor.intra_op_threads,
+                  executor=executor.stats)
+    print("Dengan executor:", json.dumps(report))
+    executor.shutdown()
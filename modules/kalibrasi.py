@@ -0,0 +1,163 @@
+# =============================================================
+# 🎚 KALIBRASI THRESHOLD — skor → presisi dari seluruh dataset
+# -------------------------------------------------------------
+# Ground truth: pasangan pertanyaan→jawaban di dataset (query i relevan
+# dengan jawaban i, plus jawaban lain yang teksnya identik). Semua
+# query × corpus diskor dengan engine blocked (similarity.py), top-K
+# disimpan, lalu:
+#   - kurva presisi per band skor (isotonic / monoton naik)
+#   - threshold = batas bawah band terendah dengan presisi >= target
+# Hasil ditulis ke metadata store (embeddings_all.meta.json) dan dipakai
+# app.py / evaluasi.py menggantikan 0.85 / 0.9 yang di-hard-code.
+#
+# Catatan: jawaban lain yang sebenarnya relevan dihitung sebagai salah,
+# jadi presisi di sini adalah batas bawah (konservatif).
+#
+# Jalankan dari root repo: python -m modules.kalibrasi [--model e5-small]
+# =============================================================
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from modules.model_registry import add_model_arg, get_spec
+from modules.similarity import blocked_topk
+from modules.store_meta import get_manifest, lineage_id, update_meta
+
+
+def relevance_matrix(top_idx, answers):
+    """rel[i, j] = True bila kandidat top_idx[i, j] adalah jawaban query i."""
+    # Kelompokkan jawaban identik → id yang sama
+    _, answer_id = np.unique(np.asarray(answers, dtype=str), return_inverse=True)
+    return answer_id[top_idx] == answer_id[np.arange(len(top_idx))][:, None]
+
+
+def isotonic(y, w):
+    """Pool-adjacent-violators: y non-decreasing, berbobot w."""
+    blocks = [[float(v), float(n), 1] for v, n in zip(y, w)]
+    out = []
+    for b in blocks:
+        out.append(b)
+        while len(out) > 1 and out[-2][0] > out[-1][0]:
+            v2, n2, c2 = out.pop()
+            v1, n1, c1 = out.pop()
+            n = n1 + n2
+            out.append([(v1 * n1 + v2 * n2) / n if n else 0.0, n, c1 + c2])
+    return np.concatenate([[v] * c for v, _, c in out])
+
+
+def precision_bands(scores, rel, n_bands=20):
+    """Band skor (kuantil) dengan presisi isotonic per band."""
+    edges = np.unique(np.quantile(scores, np.linspace(0, 1, n_bands + 1)))
+    which = np.clip(np.searchsorted(edges, scores, side="right") - 1,
+                    0, len(edges) - 2)
+    counts = np.bincount(which, minlength=len(edges) - 1)
+    hits = np.bincount(which, weights=rel, minlength=len(edges) - 1)
+    raw = np.divide(hits, counts, out=np.zeros(len(counts)), where=counts > 0)
+    smooth = isotonic(raw, counts)
+
+    bands = []
+    for i in range(len(counts)):
+        hi = float(edges[i + 1]) if i < len(counts) - 1 else 1.0 + 1e-6
+        bands.append({
+            "lo": round(float(edges[i]), 6), "hi": round(hi, 6),
+            "n": int(counts[i]),
+            "precision": round(float(smooth[i]), 4),
+            "raw_precision": round(float(raw[i]), 4),
+        })
+    return bands
+
+
+def threshold_for_band_precision(bands, target):
+    """Batas bawah band terendah dengan presisi (isotonic) >= target.
+
+    Presisi marginal per band, bukan kumulatif: band skor tinggi tidak
+    boleh "menyubsidi" band lemah di bawahnya. Karena kurva isotonic
+    monoton, semua band di atas threshold juga memenuhi target.
+    """
+    for band in bands:
+        if band["n"] and band["precision"] >= target:
+            return band["lo"]
+    return None
+
+
+def threshold_pair(bands, target_relevant, target_high):
+    """Threshold relevan + sangat relevan sebagai pasangan konsisten.
+
+    Target "high" tidak tercapai → batasnya di atas skor mana pun (tidak
+    ada yang "sangat relevan", early exit mati) — bukan default 0.9 yang
+    bisa di bawah threshold relevan. Selalu high >= relevant.
+    """
+    relevant = threshold_for_band_precision(bands, target_relevant)
+    high = threshold_for_band_precision(bands, target_high)
+    if relevant is None:
+        return {"relevant": None, "high": None}  # keduanya default
+    if high is None:
+        high = bands[-1]["hi"]
+    return {"relevant": relevant, "high": max(high, relevant)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kalibrasi threshold skor")
+    add_model_arg(parser)
+    parser.add_argument("--emb-file", default=None,
+                        help="Default: store model di registry")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--target-relevant", type=float, default=0.7,
+                        help="Presisi minimum untuk kandidat 'relevan'")
+    parser.add_argument("--target-high", type=float, default=0.9,
+                        help="Presisi minimum untuk 'sangat relevan'")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--bands", type=int, default=20)
+    args = parser.parse_args()
+    if args.emb_file is None:
+        args.emb_file = get_spec(args.model)["emb_file"]
+
+    start_time = time.time()
+    data = np.load(args.emb_file, allow_pickle=True)
+    query_emb  = data["query_embeddings"]
+    corpus_emb = data["corpus_embeddings"]
+    answers    = data["answers"]
+    print(f"📄 Query × corpus: {len(query_emb)} × {len(corpus_emb)}")
+
+    top_idx, top_scores = blocked_topk(query_emb, corpus_emb, k=args.k,
+                                       n_workers=args.workers)
+    rel = relevance_matrix(top_idx, answers)
+
+    scores = top_scores.ravel().astype(np.float64)
+    rel_flat = rel.ravel().astype(np.float64)
+
+    top1_acc = float(rel[:, 0].mean())
+    recall_k = float(rel.any(axis=1).mean())
+    print(f"🎯 Top-1 benar: {top1_acc:.3f}  |  Recall@{args.k}: {recall_k:.3f}")
+
+    bands = precision_bands(scores, rel_flat, args.bands)
+    thresholds = threshold_pair(bands, args.target_relevant, args.target_high)
+
+    print("\nBand skor → presisi (isotonic):")
+    for b in bands:
+        print(f"  [{b['lo']:.4f}, {b['hi']:.4f})  n={b['n']:<6} "
+              f"presisi={b['precision']:.3f}")
+    print(f"\n🎚 Threshold relevan (presisi >= {args.target_relevant}): "
+          f"{thresholds['relevant']}")
+    print(f"🎚 Threshold sangat relevan (presisi >= {args.target_high}): "
+          f"{thresholds['high']}")
+
+    manifest = get_manifest(data)
+    update_meta(args.emb_file, calibration={
+        # Terikat ke isi store: build ulang → kalibrasi lama diabaikan
+        "store_id": manifest["store_id"] if manifest else None,
+        "lineage_id": lineage_id(manifest),  # bertahan lewat compaction
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "n_queries": int(len(query_emb)),
+        "k": args.k,
+        "top1_accuracy": round(top1_acc, 4),
+        f"recall_at_{args.k}": round(recall_k, 4),
+        "targets": {"relevant": args.target_relevant, "high": args.target_high},
+        "thresholds": thresholds,
+        "bands": bands,
+    })
+    print(f"\n📁 Kalibrasi disimpan ke metadata {args.emb_file}")
+    print(f"⏱ Waktu: {round(time.time() - start_time, 2)} detik")
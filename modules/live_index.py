@@ -0,0 +1,619 @@
+# ============================================================
+# 🔄 LIVE INDEX — Base + Delta Segment (tanpa restart aplikasi)
+# ------------------------------------------------------------
+# Format:
+#   embeddings_all.npz              → base (hasil embedding_model.py)
+#   embeddings_delta/segment_*.npz  → delta append-only, key sama
+#                                     dengan base (corpus_embeddings,
+#                                     query_embeddings, answers, questions)
+#
+# Watcher memeriksa folder delta secara berkala, memuat segmen baru,
+# lalu mengganti snapshot in-memory secara atomik (satu assignment
+# referensi). Pencarian membaca snapshot lama sampai swap selesai,
+# jadi serving tidak pernah berhenti. Compaction menggabungkan
+# base + delta menjadi base baru (tulis ke file sementara → os.replace).
+# Segmen yang sudah digabung dipindah ke embeddings_delta/compacted/;
+# build ulang base (embedding_model.py) mengembalikannya sebagai delta,
+# jadi QA tambahan tidak hilang saat base dibangun ulang dari dataset.
+#
+# Jalankan dari root repo:
+#   python -m modules.live_index add  data_baru.xlsx
+#   python -m modules.live_index compact
+#   python -m modules.live_index --model e5-small add data_baru.xlsx
+# ============================================================
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from modules.categories import (
+    CATEGORY_PATTERNS, build_category_arrays, category_rows, tag_texts,
+)
+from modules.coarse_search import project, shortlist
+from modules.similarity import gated_search, iter_blocks, iter_matrix_blocks
+from modules.snippets import SNIPPET_KEYS, Snippets, build_snippet_arrays
+from modules.store_meta import (
+    MANIFEST_KEY, build_manifest, get_manifest, lineage_id, save_store,
+    store_lock,
+)
+
+EMB_FILE  = "embeddings_all.npz"
+DELTA_DIR = "embeddings_delta"
+
+SEGMENT_RE = re.compile(r"^segment_(\d{20})\.npz$")
+ARCHIVE_DIR = "compacted"   # subfolder delta_dir: segmen yang sudah digabung
+COMPACTED_KEY = "compacted_segments"
+# Array satu-baris-per-QA di store (embedding_model.py). Array lain
+# (cluster, PCA, snippet, kategori) bukan per-baris walau panjangnya
+# kebetulan sama dengan jumlah baris.
+ROW_KEYS = frozenset({
+    "corpus_embeddings", "query_embeddings", "answers", "questions",
+    "answer_token_counts", "question_token_counts", "corpus_coarse",
+})
+
+
+# ============================================================
+# Segment (append-only)
+# ============================================================
+def list_segments(delta_dir=DELTA_DIR):
+    """Nama file segmen yang sudah lengkap, terurut menurut nomor."""
+    if not os.path.isdir(delta_dir):
+        return []
+    return sorted(f for f in os.listdir(delta_dir) if SEGMENT_RE.match(f))
+
+
+def archive_dir(delta_dir=DELTA_DIR):
+    return os.path.join(delta_dir, ARCHIVE_DIR)
+
+
+def restore_archived(delta_dir=DELTA_DIR):
+    """Kembalikan segmen arsip ke delta_dir sebagai delta aktif; return namanya.
+
+    Dipanggil saat base dibangun ulang, di bawah store_lock dan SEBELUM
+    base baru ditulis: selama base lama masih ada, segmen ini tetap
+    diabaikan karena tercatat di COMPACTED_KEY-nya (tidak terhitung dua kali).
+    """
+    names = list_segments(archive_dir(delta_dir))
+    for name in names:
+        os.replace(os.path.join(archive_dir(delta_dir), name),
+                   os.path.join(delta_dir, name))
+    return names
+
+
+def missing_segments(emb_file, delta_dir=DELTA_DIR):
+    """Segmen yang sudah digabung ke emb_file tapi tidak ada lagi di disk
+    (compaction versi lama menghapusnya). Build ulang akan kehilangan isinya."""
+    with np.load(emb_file, allow_pickle=True) as data:
+        if COMPACTED_KEY not in data.files:
+            return []
+        compacted = [str(n) for n in data[COMPACTED_KEY]]
+    on_disk = set(list_segments(delta_dir)) | set(list_segments(archive_dir(delta_dir)))
+    return [n for n in compacted if n not in on_disk]
+
+
+def append_segment(arrays, delta_dir=DELTA_DIR):
+    """Tulis satu segmen delta baru; return nama file-nya.
+
+    File ditulis dengan nama sementara lalu di-rename, sehingga watcher
+    tidak pernah membaca segmen setengah jadi.
+    """
+    os.makedirs(delta_dir, exist_ok=True)
+    # Nomor = timestamp ns: terurut dan tidak pernah dipakai ulang,
+    # juga setelah segmen lama dipindah ke arsip oleh compaction.
+    existing = list_segments(delta_dir)
+    seq = time.time_ns()
+    if existing:
+        seq = max(seq, int(SEGMENT_RE.match(existing[-1]).group(1)) + 1)
+    name = f"segment_{seq:020d}.npz"
+
+    tmp_path = os.path.join(delta_dir, f".{name}.tmp.npz")
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, os.path.join(delta_dir, name))
+    return name
+
+
+def _load_npz(path):
+    with np.load(path, allow_pickle=True) as data:
+        return {key: data[key] for key in data.files}
+
+
+def _file_sig(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+# ============================================================
+# Snapshot — immutable, aman dibaca dari banyak thread
+# ============================================================
+class RowText:
+    """Teks base + delta sebagai satu array (indeks baris global)."""
+
+    def __init__(self, base, deltas):
+        self.base = base
+        self.delta = (np.concatenate(deltas) if deltas
+                      else np.empty(0, dtype=object))
+
+    def __len__(self):
+        return len(self.base) + len(self.delta)
+
+    def __getitem__(self, i):
+        i = int(i)
+        if i < len(self.base):
+            return self.base[i]
+        return self.delta[i - len(self.base)]
+
+
+class QueryCache:
+    """LRU kecil thread-safe; hidup selama snapshot-nya hidup."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class IndexSnapshot:
+    """Base matrix + delta matrix yang dicari bersama-sama."""
+
+    def __init__(self, base, deltas, segment_names, base_sig):
+        self.base = base
+        self.segment_names = tuple(segment_names)
+        self.base_sig = base_sig
+
+        self.base_emb = base["corpus_embeddings"]
+        if deltas:
+            self.delta_emb = np.concatenate(
+                [d["corpus_embeddings"] for d in deltas]).astype(
+                    self.base_emb.dtype, copy=False)
+        else:
+            self.delta_emb = self.base_emb[:0]
+
+        # Teks base tidak disalin (bisa berupa TextBlob di shared memory)
+        self.answers = RowText(
+            base["answers"], [d["answers"] for d in deltas])
+        self.questions = RowText(
+            base["questions"], [d["questions"] for d in deltas])
+
+        # Fragmen HTML jawaban (preview + escaped) dari build; delta on-the-fly
+        self.snippets = Snippets(base, self.answers)
+
+        # Urutan cluster dari embedding_model.py (opsional)
+        self.cluster_offsets = base.get("cluster_offsets")
+        self.cluster_centroids = base.get("cluster_centroids")
+
+        # Proyeksi PCA untuk coarse search (opsional)
+        self.corpus_coarse = base.get("corpus_coarse")
+        self.pca_components = base.get("pca_components")
+        if self.corpus_coarse is not None and len(self.corpus_coarse) != self.n_base:
+            self.corpus_coarse = None
+
+        # Kategori: bitmap dari build → indeks baris; delta di-tag on-the-fly
+        self.category_index = category_rows(base, self.n_base)
+        keys = [k for k in self.category_index if k in CATEGORY_PATTERNS]
+        if keys and len(self.delta_emb):
+            mask = tag_texts(self.questions.delta, self.answers.delta, keys)
+            for j, key in enumerate(keys):
+                self.category_index[key] = np.concatenate(
+                    [self.category_index[key], np.flatnonzero(mask[:, j]) + self.n_base])
+
+        # Cache turunan per query (mis. PRF); otomatis basi saat swap
+        self.cache = QueryCache()
+
+    def __len__(self):
+        return len(self.base_emb) + len(self.delta_emb)
+
+    @property
+    def n_base(self):
+        return len(self.base_emb)
+
+    def embedding_rows(self, idx):
+        """Embedding corpus untuk indeks baris global (base + delta)."""
+        idx = np.asarray(idx, dtype=np.int64)
+        if not len(self.delta_emb):
+            return self.base_emb[idx]
+        in_base = idx < self.n_base
+        rows = np.empty((len(idx), self.base_emb.shape[1]), self.base_emb.dtype)
+        rows[in_base] = self.base_emb[idx[in_base]]
+        rows[~in_base] = self.delta_emb[idx[~in_base] - self.n_base]
+        return rows
+
+    @property
+    def categories(self):
+        return list(self.category_index)
+
+    def category_members(self, category):
+        """Indeks baris global milik satu kategori."""
+        if category not in self.category_index:
+            raise ValueError(f"Kategori '{category}' tidak ada di store")
+        return self.category_index[category]
+
+    def _category_matrices(self, category):
+        """(indeks baris, embedding) per blok, di-gather saat query.
+
+        Sengaja tidak di-cache: salinan per kategori per proses akan
+        menggandakan embedding di tiap replika dan membatalkan shared
+        memory. Gather per blok (maks BLOCK_SIZE baris) lebih mahal dari
+        subset yang sudah jadi, tapi tetap lebih murah dari scan penuh
+        selama kategori < ~1/3 corpus (semua kategori saat ini <= 22%).
+        """
+        rows = self.category_members(category)
+        for start, stop in iter_blocks(len(rows)):
+            yield rows[start:stop], self.embedding_rows(rows[start:stop])
+
+    def scores(self, q_emb):
+        """Skor cosine untuk seluruh corpus (base lalu delta)."""
+        base_scores = np.dot(self.base_emb, q_emb)
+        if not len(self.delta_emb):
+            return base_scores
+        return np.concatenate([base_scores, np.dot(self.delta_emb, q_emb)])
+
+    def search_batch(self, q_embs, min_score, max_k, category=None):
+        """Banyak query sekaligus: satu perkalian matriks × matriks.
+
+        Dengan category, hanya subset kategori itu yang di-skor.
+        Returns list dict (format sama dengan gated_search), satu per query.
+        """
+        q_embs = np.asarray(q_embs, dtype=self.base_emb.dtype)
+        if category is not None:
+            rows = self.category_members(category)
+            S = np.empty((len(q_embs), len(rows)), dtype=self.base_emb.dtype)
+            for start, stop in iter_blocks(len(rows)):  # gather per blok
+                S[:, start:stop] = q_embs @ self.embedding_rows(rows[start:stop]).T
+        else:
+            rows = None
+            S = q_embs @ self.base_emb.T
+            if len(self.delta_emb):
+                S = np.concatenate([S, q_embs @ self.delta_emb.T], axis=1)
+
+        if not S.shape[1]:  # kategori kosong
+            return [{"hits": [], "best_idx": -1, "best_score": -np.inf,
+                     "scanned": 0, "early_exit": False} for _ in q_embs]
+
+        k = min(max_k, S.shape[1])
+        top = np.argpartition(-S, k - 1, axis=1)[:, :k]
+        top_s = np.take_along_axis(S, top, axis=1)
+        order = np.argsort(-top_s, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_s = np.take_along_axis(top_s, order, axis=1)
+        if rows is not None:
+            top = rows[top]
+
+        results = []
+        for idx, sc in zip(top, top_s):
+            results.append({
+                "hits": [(int(i), float(v)) for i, v in zip(idx, sc)
+                         if v >= min_score],
+                "best_idx": int(idx[0]),
+                "best_score": float(sc[0]),
+                "scanned": S.shape[1],
+                "early_exit": False,
+            })
+        return results
+
+    @property
+    def has_coarse(self):
+        return self.corpus_coarse is not None
+
+    def gated_search(self, q_emb, min_score, max_k, high_confidence=None,
+                     coarse_dim=None, shortlist_size=200, category=None):
+        """Hanya hit >= min_score (lihat similarity.gated_search).
+
+        Dengan coarse_dim, base hanya di-rescore pada shortlist PCA
+        (lihat coarse_search); delta selalu di-scan penuh.
+        Dengan category, hanya subset kategori yang di-scan (exact;
+        coarse_dim diabaikan karena subset sudah kecil).
+        """
+        if category is not None:
+            blocks = self._category_matrices(category)
+        else:
+            blocks = self._scan_blocks(q_emb, coarse_dim, shortlist_size)
+        return gated_search(blocks, q_emb, min_score, max_k, high_confidence)
+
+    def _scan_blocks(self, q_emb, coarse_dim=None, shortlist_size=200):
+        # Delta dulu (kecil, konten terbaru), lalu base per cluster:
+        # cluster dengan centroid paling mirip query di-scan lebih dulu.
+        yield from iter_matrix_blocks(self.delta_emb, offset=self.n_base)
+
+        if coarse_dim and self.has_coarse:
+            rows = shortlist(self.corpus_coarse, self.pca_components, q_emb,
+                             coarse_dim, shortlist_size)
+            yield rows, self.base_emb[rows]
+            return
+
+        if self.cluster_offsets is None:
+            yield from iter_matrix_blocks(self.base_emb)
+            return
+
+        off = self.cluster_offsets
+        order = np.argsort(-(self.cluster_centroids @ q_emb))
+        ranges = [(off[c], off[c + 1]) for c in order]
+        if off[-1] < self.n_base:  # store lama: baris compaction belum ter-cluster
+            ranges.append((off[-1], self.n_base))
+        yield from iter_matrix_blocks(self.base_emb, ranges=ranges)
+
+
+# ============================================================
+# Live Index
+# ============================================================
+class LiveIndex:
+    def __init__(self, emb_file=EMB_FILE, delta_dir=DELTA_DIR,
+                 compact_min_segments=20, loader=None, validate=None):
+        self.emb_file = emb_file
+        self.delta_dir = delta_dir
+        self.compact_min_segments = compact_min_segments
+        # loader(path) → dict array base; default np.load biasa,
+        # atau shared_store.SharedStoreLoader untuk banyak worker
+        self.loader = loader or _load_npz
+        # validate(base) → raise bila base tidak valid (mis. manifest
+        # tidak cocok); snapshot lama tetap dipakai
+        self.validate = validate
+
+        self._lock = threading.Lock()      # hanya untuk writer (refresh/compact)
+        self._segment_cache = {}
+        self._stop = threading.Event()
+        self._watcher = None
+        self._snapshot = None
+        self.refresh()
+
+    def snapshot(self):
+        """Snapshot aktif. Simpan referensinya selama satu request."""
+        return self._snapshot
+
+    # --------------------------------------------------------
+    def refresh(self):
+        """Muat base/segmen baru bila ada; return True kalau ada swap."""
+        with self._lock:
+            current = self._snapshot
+            base_sig = _file_sig(self.emb_file)
+
+            if current is not None and current.base_sig == base_sig:
+                base = current.base
+            else:
+                base = self.loader(self.emb_file)
+                if self.validate is not None:
+                    self.validate(base)
+
+            compacted = set(base.get(COMPACTED_KEY, ()))
+            names = [n for n in list_segments(self.delta_dir)
+                     if n not in compacted]
+
+            if (current is not None and current.base_sig == base_sig
+                    and current.segment_names == tuple(names)):
+                return False
+
+            deltas = [self._load_segment(n) for n in names]
+            self._segment_cache = {n: self._segment_cache[n] for n in names}
+            self._snapshot = IndexSnapshot(base, deltas, names, base_sig)
+            return True
+
+    def _load_segment(self, name):
+        if name not in self._segment_cache:
+            self._segment_cache[name] = _load_npz(
+                os.path.join(self.delta_dir, name))
+        return self._segment_cache[name]
+
+    # --------------------------------------------------------
+    def compact(self):
+        """Gabungkan base + semua delta menjadi base baru secara atomik.
+
+        Dipegang store_lock (antar-proses). Bila emb_file sudah bukan base
+        yang dimuat snapshot ini (proses lain sudah compact / build ulang),
+        compaction ditolak: menimpanya akan membuang segmen yang tidak
+        kita lihat. refresh() berikutnya memuat base baru.
+        """
+        with self._lock, store_lock(self.emb_file):
+            snap = self._snapshot
+            if not snap.segment_names:
+                return False
+            if _file_sig(self.emb_file) != snap.base_sig:
+                return False
+
+            deltas = [self._segment_cache[n] for n in snap.segment_names]
+            merged = compact_arrays(snap.base, deltas)
+            merged[COMPACTED_KEY] = np.array(
+                sorted(set(snap.base.get(COMPACTED_KEY, ()))
+                       | set(snap.segment_names)), dtype=object)
+
+            save_store(self.emb_file, merged, compact_manifest(snap.base, merged))
+
+            # Swap dulu, baru arsipkan segmen lama (masih di bawah lock).
+            # Tidak dihapus: build ulang base mengembalikannya (restore_archived)
+            self._segment_cache = {}
+            self._snapshot = IndexSnapshot(
+                self.loader(self.emb_file), [], [], _file_sig(self.emb_file))
+
+            os.makedirs(archive_dir(self.delta_dir), exist_ok=True)
+            for name in snap.segment_names:
+                try:
+                    os.replace(os.path.join(self.delta_dir, name),
+                               os.path.join(archive_dir(self.delta_dir), name))
+                except FileNotFoundError:
+                    pass
+        return True
+
+    # --------------------------------------------------------
+    def start_watcher(self, interval=5.0, auto_compact=True):
+        """Thread daemon: refresh berkala + compaction periodik."""
+        if self._watcher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                    if (auto_compact and len(self._snapshot.segment_names)
+                            >= self.compact_min_segments):
+                        self.compact()
+                except Exception as e:  # watcher tidak boleh mati
+                    print(f"⚠️ LiveIndex watcher: {e}")
+
+        self._watcher = threading.Thread(
+            target=loop, name="live-index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+def compact_arrays(base, deltas):
+    """Gabungkan array per-baris (ROW_KEYS); array lain disalin dari base.
+
+    Array per-baris yang tidak ada di semua segmen dibuang, karena
+    tidak bisa digabung dengan benar (dibangun ulang oleh build berikutnya).
+    """
+    merged = {}
+    for key, value in base.items():
+        if key in (COMPACTED_KEY, MANIFEST_KEY):
+            continue
+        if hasattr(value, "to_array"):  # TextBlob dari shared store
+            value = value.to_array()
+        if key not in ROW_KEYS:
+            merged[key] = value
+        elif all(key in d for d in deltas):
+            merged[key] = np.concatenate([value] + [d[key] for d in deltas])
+        elif key == "corpus_coarse":
+            # Turunan: proyeksikan delta dengan PCA yang sama
+            merged[key] = np.concatenate([value] + [
+                project(d["corpus_embeddings"], base["pca_mean"],
+                        base["pca_components"]) for d in deltas])
+    if "cluster_offsets" in merged and "cluster_centroids" in merged:
+        recluster(merged)
+    if all(k in base for k in SNIPPET_KEYS):
+        # Turunan teks: bangun ulang untuk semua baris gabungan
+        merged.update(build_snippet_arrays(merged["answers"]))
+    if "category_bits" in base:
+        merged.update(build_category_arrays(merged["questions"], merged["answers"]))
+    return merged
+
+
+def recluster(merged):
+    """Masukkan baris di luar cluster (delta, sisa compaction lama) ke
+    centroid terdekat, lalu urutkan ulang semua array per-baris.
+
+    Tanpa ini baris baru berada di ekor yang di-scan paling akhir, dan
+    early exit HIGH_CONFIDENCE bisa berhenti sebelum sampai ke sana.
+    Centroid tidak dihitung ulang (build berikutnya yang melakukannya).
+    """
+    off = np.asarray(merged["cluster_offsets"])
+    centroids = np.asarray(merged["cluster_centroids"])
+    emb = merged["corpus_embeddings"]
+
+    labels = np.empty(len(emb), dtype=np.int64)
+    labels[:off[-1]] = np.repeat(np.arange(len(centroids)), np.diff(off))
+    tail = emb[off[-1]:]
+    if len(tail):
+        labels[off[-1]:] = np.argmax(tail @ centroids.T, axis=1)
+
+    perm = np.argsort(labels, kind="stable")  # urutan dalam cluster tetap
+    for key in ROW_KEYS & merged.keys():
+        merged[key] = merged[key][perm]
+    counts = np.bincount(labels, minlength=len(centroids))
+    merged["cluster_offsets"] = np.concatenate([[0], np.cumsum(counts)]).astype(
+        off.dtype)
+
+
+def compact_manifest(base, merged):
+    """Manifest baru untuk hasil compaction (konfigurasi dari base).
+
+    Base lama tanpa manifest tetap tanpa manifest (model tidak diketahui).
+    """
+    old = get_manifest(base)
+    if old is None:
+        return None
+    inputs = dict(old["inputs"], compacted_from=old["store_id"],
+                  lineage_id=lineage_id(old))
+    return build_manifest(merged, old["model_name"], inputs,
+                          old["prefixes"], old["normalization"])
+
+
+# ============================================================
+# CLI — tambah pasangan QA baru / compaction manual
+# ============================================================
+if __name__ == "__main__":
+    import argparse
+
+    from modules.model_registry import (
+        add_model_arg, encode, get_spec, passage_text, query_text,
+    )
+
+    parser = argparse.ArgumentParser(description="Kelola live index")
+    add_model_arg(parser)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_add = sub.add_parser(
+        "add", help="Encode file QA bersih (.parquet/.arrow/.xlsx) → segmen delta")
+    p_add.add_argument("data_file")
+
+    sub.add_parser("compact", help="Gabungkan delta ke base")
+    args = parser.parse_args()
+
+    # Store per model (model_registry.py)
+    spec = get_spec(args.model)
+    emb_file, delta_dir = spec["emb_file"], spec["delta_dir"]
+    start_time = time.time()
+
+    if args.cmd == "add":
+        from sentence_transformers import SentenceTransformer
+        from modules.dataset_io import read_dataset
+        from modules.store_meta import read_manifest
+
+        # Delta harus dari model yang sama dengan base
+        manifest = read_manifest(emb_file)
+        if manifest and manifest["model_name"] != spec["model_name"]:
+            raise ValueError(f"Base {emb_file} dibangun dengan "
+                             f"{manifest['model_name']}, bukan {spec['model_name']}")
+
+        df = read_dataset(args.data_file)
+        questions = df["question"].astype(str).tolist()
+        answers   = df["answer"].astype(str).tolist()
+
+        model = SentenceTransformer(spec["model_name"])
+        corpus_embeddings = encode(
+            model, spec, [passage_text(spec, a) for a in answers])
+        query_embeddings = encode(
+            model, spec, [query_text(spec, q) for q in questions])
+
+        name = append_segment({
+            "corpus_embeddings": corpus_embeddings,
+            "query_embeddings":  query_embeddings,
+            "answers":   np.array(answers, dtype=object),
+            "questions": np.array(questions, dtype=object),
+        }, delta_dir)
+        print(f"✅ {len(answers)} pasangan QA ditambahkan → {delta_dir}/{name}")
+
+    elif args.cmd == "compact":
+        index = LiveIndex(emb_file, delta_dir)
+        n_seg = len(index.snapshot().segment_names)
+        compacted = index.compact()
+        if not compacted and index.refresh():
+            # Base diganti proses lain (mis. watcher app) → ulang dengan base baru
+            n_seg = len(index.snapshot().segment_names)
+            compacted = index.compact()
+        if compacted:
+            print(f"✅ {n_seg} segmen digabung ke {emb_file} "
+                  f"(total {len(index.snapshot())} baris)")
+        else:
+            print("ℹ️ Tidak ada segmen delta.")
+
+    print(f"⏱ Waktu: {round(time.time() - start_time, 2)} detik")
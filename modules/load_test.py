@@ -0,0 +1,274 @@
+# ============================================================
+# 📈 LOAD TEST — replay pertanyaan dataset ke jalur retrieval
+# ------------------------------------------------------------
+# Query diambil dari kolom `question` dataset (opsional diberi
+# perturbasi: typo, kata hilang/tertukar, sapaan). Dua mode beban:
+#   --concurrency N : N user closed-loop (kirim lagi setelah dijawab)
+#   --qps R         : open-loop R request/detik; latency dihitung dari
+#                     jadwal kirim, jadi antrean ikut terukur
+# Target:
+#   inprocess (default) : serving.search() di proses ini
+#   --url http://...    : POST /search ke server (python -m modules.serving)
+# Laporan per interval + ringkasan: persentil latency, throughput,
+# error rate, RSS memori (proses ini, atau --server-pid untuk HTTP).
+#
+# Contoh (dari root repo):
+#   python -m modules.load_test --concurrency 8 --duration 60
+#   python -m modules.load_test --qps 20 --url http://localhost:8600
+# ============================================================
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from modules.dataset_io import read_dataset, resolve_dataset
+from modules.model_registry import add_model_arg
+
+FILLERS = ["dok, ", "halo dokter, ", "selamat pagi dok, ", "permisi, "]
+
+
+# ============================================================
+# Query
+# ============================================================
+def load_questions(path=None, limit=None):
+    path = path or resolve_dataset("DATASET TANYA JAWAB CLEAN_QA.xlsx")
+    questions = read_dataset(path, columns=["question"])["question"]
+    questions = [q for q in questions.astype(str) if q.strip()]
+    return questions[:limit] if limit else questions
+
+
+def perturb(text, rng, rate=0.3):
+    """Variasi ringan seperti ketikan user asli (tiap operasi peluang `rate`)."""
+    words = text.split()
+    if len(words) > 3 and rng.random() < rate:      # kata hilang
+        del words[rng.randrange(len(words))]
+    if len(words) > 3 and rng.random() < rate:      # dua kata tertukar
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    if words and rng.random() < rate:               # typo (tukar huruf)
+        i = rng.randrange(len(words))
+        w = words[i]
+        if len(w) > 3:
+            j = rng.randrange(len(w) - 1)
+            words[i] = w[:j] + w[j + 1] + w[j] + w[j + 2:]
+    out = " ".join(words)
+    if rng.random() < rate:
+        out = out.lower()
+    if rng.random() < rate:
+        out = rng.choice(FILLERS) + out
+    return out
+
+
+# ============================================================
+# Target
+# ============================================================
+def inprocess_target(model=None):
+    from modules import serving
+    serving.get_index(model)
+    serving.warm_up_replica(rounds=1)
+    return lambda query: serving.search(query, model=model)
+
+
+def http_target(url, model=None, timeout=30.0):
+    endpoint = url.rstrip("/") + "/search"
+
+    def call(query):
+        payload = {"query": query}
+        if model:
+            payload["model"] = model
+        req = urllib.request.Request(
+            endpoint, data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"HTTP {e.code}") from None
+    return call
+
+
+def rss_mb(pid=None):
+    """Resident memory (MB) dari /proc; None bila tidak tersedia."""
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+# ============================================================
+# Recorder
+# ============================================================
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []     # (selesai_t, latency_s)
+        self.errors = []        # (selesai_t, jenis)
+
+    def ok(self, latency):
+        with self._lock:
+            self.latencies.append((time.perf_counter(), latency))
+
+    def error(self, exc):
+        name = str(exc) if isinstance(exc, RuntimeError) else type(exc).__name__
+        with self._lock:
+            self.errors.append((time.perf_counter(), name))
+
+    def window(self, t_from, t_to):
+        with self._lock:
+            lat = [l for t, l in self.latencies if t_from <= t < t_to]
+            err = [e for t, e in self.errors if t_from <= t < t_to]
+        return lat, err
+
+
+def summarize(latencies, errors, seconds):
+    total = len(latencies) + len(errors)
+    lat_ms = 1000 * np.array(latencies) if latencies else np.zeros(1)
+    kinds = {}
+    for e in errors:
+        kinds[e] = kinds.get(e, 0) + 1
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "error_rate": round(len(errors) / total, 4) if total else 0.0,
+        "errors": kinds,
+        "throughput_rps": round(len(latencies) / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 1),
+        "p90_ms": round(float(np.percentile(lat_ms, 90)), 1),
+        "p99_ms": round(float(np.percentile(lat_ms, 99)), 1),
+        "max_ms": round(float(lat_ms.max()), 1),
+    }
+
+
+# ============================================================
+# Beban
+# ============================================================
+def run_load(call, next_query, recorder, duration, concurrency=None, qps=None):
+    """Jalankan beban selama `duration` detik (closed- atau open-loop)."""
+    stop_at = time.perf_counter() + duration
+
+    def one(scheduled):
+        query = next_query()
+        try:
+            call(query)
+            recorder.ok(time.perf_counter() - scheduled)
+        except Exception as e:
+            recorder.error(e)
+
+    if qps:
+        # Open loop: jadwal tetap, tidak menunggu jawaban sebelumnya
+        interval = 1.0 / qps
+        with ThreadPoolExecutor(max_workers=concurrency or 64) as pool:
+            scheduled = time.perf_counter()
+            while scheduled < stop_at:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, scheduled)
+                scheduled += interval
+    else:
+        def user():
+            while time.perf_counter() < stop_at:
+                one(time.perf_counter())
+
+        threads = [threading.Thread(target=user) for _ in range(concurrency or 1)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test retrieval")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=None,
+                      help="User closed-loop bersamaan (default 4)")
+    mode.add_argument("--qps", type=float, default=None,
+                      help="Open-loop: request per detik")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--url", default=None,
+                        help="Server HTTP (POST /search); kosong = in-process")
+    parser.add_argument("--server-pid", type=int, default=None,
+                        help="PID server untuk memantau memori (mode HTTP)")
+    parser.add_argument("--data-file", default=None)
+    parser.add_argument("--perturb", type=float, default=0.0,
+                        help="Peluang tiap perturbasi (0 = query asli)")
+    parser.add_argument("--report-every", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Simpan laporan JSON")
+    add_model_arg(parser)
+    args = parser.parse_args()
+
+    questions = load_questions(args.data_file)
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+
+    def next_query():
+        with rng_lock:
+            q = rng.choice(questions)
+            return perturb(q, rng, args.perturb) if args.perturb else q
+
+    call = (http_target(args.url, args.model) if args.url
+            else inprocess_target(args.model))
+    mem_pid = args.server_pid if args.url else None
+    concurrency = args.concurrency or (None if args.qps else 4)
+    print(f"📈 {len(questions)} pertanyaan | "
+          f"{f'{args.qps} qps' if args.qps else f'{concurrency} user'} | "
+          f"{args.duration}s | target: {args.url or 'in-process'}")
+
+    recorder = Recorder()
+    worker = threading.Thread(target=run_load, args=(
+        call, next_query, recorder, args.duration, concurrency, args.qps))
+
+    mem_start = rss_mb(mem_pid)
+    t_start = time.perf_counter()
+    worker.start()
+
+    intervals = []
+    t_prev = t_start
+    while worker.is_alive():
+        worker.join(args.report_every)
+        t_now = time.perf_counter()
+        stats = summarize(*recorder.window(t_prev, t_now), t_now - t_prev)
+        stats["t_s"] = round(t_now - t_start, 1)
+        stats["rss_mb"] = rss_mb(mem_pid)
+        intervals.append(stats)
+        print(f"  t={stats['t_s']:>6}s  {stats['throughput_rps']:>7} rps  "
+              f"p50={stats['p50_ms']:>7}ms  p99={stats['p99_ms']:>7}ms  "
+              f"err={stats['error_rate']:.2%}  rss={stats['rss_mb']}")
+        t_prev = t_now
+
+    elapsed = time.perf_counter() - t_start
+    summary = summarize([l for _, l in recorder.latencies],
+                        [e for _, e in recorder.errors], elapsed)
+    mem_end = rss_mb(mem_pid)
+    summary.update({
+        "duration_s": round(elapsed, 1),
+        "mode": {"qps": args.qps} if args.qps else {"concurrency": concurrency},
+        "target": args.url or "in-process",
+        "model": args.model,
+        "perturb": args.perturb,
+        "rss_start_mb": mem_start,
+        "rss_end_mb": mem_end,
+        "rss_growth_mb": (round(mem_end - mem_start, 1)
+                          if mem_start is not None and mem_end is not None
+                          else None),
+    })
+
+    print("\n=== RINGKASAN ===")
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "intervals": intervals}, f, indent=2)
+        print(f"📁 Laporan: {args.out}")
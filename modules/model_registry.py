@@ -0,0 +1,77 @@
+# ============================================================
+# 🗃 MODEL REGISTRY — satu tempat untuk model embedding
+# ------------------------------------------------------------
+# Tiap model punya store sendiri (embedding + delta + token cache),
+# prefix dan normalisasi. Semua script memilih lewat --model <key>;
+# serving/app memilih per request. Default: env MEDISEARCH_MODEL,
+# atau DEFAULT_MODEL.
+#
+# Tambah model baru = tambah entri di MODELS, lalu bangun store-nya:
+#   python -m modules.embedding_model --model e5-small
+# ============================================================
+
+import os
+
+from modules.store_meta import DEFAULT_PREFIXES, NORMALIZATION
+
+DEFAULT_MODEL = "e5-base"
+
+MODELS = {
+    "e5-base": {
+        "model_name": "intfloat/multilingual-e5-base",
+        "label": "E5 Base (akurat)",
+        "emb_file": "embeddings_all.npz",      # nama lama dipertahankan
+        "delta_dir": "embeddings_delta",
+        "token_cache": "token_cache.npz",
+        "prefixes": DEFAULT_PREFIXES,
+        "normalization": NORMALIZATION,
+    },
+    "e5-small": {
+        "model_name": "intfloat/multilingual-e5-small",
+        "label": "E5 Small (cepat)",
+        "emb_file": "embeddings_e5-small.npz",
+        "delta_dir": "embeddings_delta_e5-small",
+        "token_cache": "token_cache_e5-small.npz",
+        "prefixes": DEFAULT_PREFIXES,
+        "normalization": NORMALIZATION,
+    },
+}
+
+
+def default_model():
+    return os.environ.get("MEDISEARCH_MODEL", DEFAULT_MODEL)
+
+
+def get_spec(key=None):
+    """Spesifikasi model (dict); key None → default_model()."""
+    key = key or default_model()
+    if key not in MODELS:
+        raise ValueError(f"Model '{key}' tidak terdaftar "
+                         f"(pilihan: {', '.join(MODELS)})")
+    return dict(MODELS[key], key=key)
+
+
+def available_models():
+    """Key model yang store-nya sudah dibangun."""
+    return [key for key, spec in MODELS.items()
+            if os.path.exists(spec["emb_file"])]
+
+
+def query_text(spec, text):
+    return spec["prefixes"]["query"] + text
+
+
+def passage_text(spec, text):
+    return spec["prefixes"]["passage"] + text
+
+
+def encode(model, spec, texts, **kwargs):
+    """model.encode dengan normalisasi sesuai spesifikasi."""
+    return model.encode(texts, convert_to_numpy=True,
+                        normalize_embeddings=spec["normalization"] == "l2",
+                        **kwargs)
+
+
+def add_model_arg(parser):
+    parser.add_argument("--model", choices=list(MODELS), default=None,
+                        help=f"Model registry (default {default_model()})")
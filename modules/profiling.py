@@ -0,0 +1,159 @@
+# ============================================================
+# 🔬 PROFILING — per tahap (cProfile + tracemalloc) + per regex
+# ------------------------------------------------------------
+# Dipakai oleh preprocessing.py dan embedding_model.py (--profile):
+#   - waktu wall & CPU per tahap
+#   - peak memori Python (tracemalloc) per tahap
+#   - top hotspot (cProfile, urut cumulative time) per tahap
+#   - rincian waktu tiap regex di cleaner (text_cleaning.py)
+# ============================================================
+
+import cProfile
+import io
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageProfiler:
+    """Kumpulkan statistik per tahap. enabled=False → tanpa overhead."""
+
+    def __init__(self, enabled=True, top_n=15):
+        self.enabled = enabled
+        self.top_n = top_n
+        self.stages = []
+        self._current = None
+
+    # --------------------------------------------------------
+    def begin(self, name):
+        if not self.enabled:
+            return
+        if self._current is not None:
+            self.end()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        profiler = cProfile.Profile()
+        self._current = {
+            "name": name,
+            "profiler": profiler,
+            "wall0": time.perf_counter(),
+            "cpu0": time.process_time(),
+            "mem0": tracemalloc.get_traced_memory()[0],
+        }
+        profiler.enable()
+
+    def end(self):
+        if not self.enabled or self._current is None:
+            return
+        cur, self._current = self._current, None
+        cur["profiler"].disable()
+
+        current_mem, peak_mem = tracemalloc.get_traced_memory()
+        out = io.StringIO()
+        stats = pstats.Stats(cur["profiler"], stream=out)
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+
+        self.stages.append({
+            "name": cur["name"],
+            "wall_s": time.perf_counter() - cur["wall0"],
+            "cpu_s": time.process_time() - cur["cpu0"],
+            "peak_mb": (peak_mem - cur["mem0"]) / 1e6,
+            "retained_mb": (current_mem - cur["mem0"]) / 1e6,
+            "hotspots": out.getvalue(),
+        })
+
+    @contextmanager
+    def stage(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    # --------------------------------------------------------
+    def summary(self):
+        lines = [f"{'Tahap':<22} | {'Wall (s)':>9} | {'CPU (s)':>8} | "
+                 f"{'Peak (MB)':>9} | {'Sisa (MB)':>9}",
+                 "-" * 70]
+        for st in self.stages:
+            lines.append(f"{st['name']:<22} | {st['wall_s']:>9.3f} | "
+                         f"{st['cpu_s']:>8.3f} | {st['peak_mb']:>9.1f} | "
+                         f"{st['retained_mb']:>9.1f}")
+        return "\n".join(lines)
+
+    def write_report(self, path, extra_sections=()):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("=== RINGKASAN PER TAHAP ===\n")
+            f.write(self.summary() + "\n")
+            for title, body in extra_sections:
+                f.write(f"\n=== {title} ===\n{body}\n")
+            for st in self.stages:
+                f.write(f"\n=== HOTSPOT: {st['name']} ===\n{st['hotspots']}")
+
+
+# ============================================================
+# Waktu per regex
+# ============================================================
+class TimedPattern:
+    """Proxy re.Pattern yang mencatat jumlah panggilan + total waktu."""
+
+    _METHODS = ("sub", "split", "findall", "match", "search", "fullmatch")
+
+    def __init__(self, name, pattern, stats):
+        self._name = name
+        self._pattern = pattern
+        self._stats = stats
+        stats.setdefault(name, {"pattern": pattern.pattern, "calls": 0,
+                                "total_s": 0.0})
+
+    def __getattr__(self, attr):
+        fn = getattr(self._pattern, attr)
+        if attr not in self._METHODS:
+            return fn
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry = self._stats[self._name]
+                entry["calls"] += 1
+                entry["total_s"] += time.perf_counter() - t0
+        return timed
+
+
+@contextmanager
+def regex_timing(module, stats):
+    """Ganti sementara semua regex level-modul dengan TimedPattern.
+
+    Termasuk list regex (mis. intro_regexes). Dipulihkan saat keluar.
+    """
+    originals = {}
+    for attr, value in list(vars(module).items()):
+        if isinstance(value, re.Pattern):
+            originals[attr] = value
+            setattr(module, attr, TimedPattern(attr, value, stats))
+        elif (isinstance(value, list) and value
+              and all(isinstance(v, re.Pattern) for v in value)):
+            originals[attr] = value
+            setattr(module, attr, [TimedPattern(f"{attr}[{i}]", v, stats)
+                                   for i, v in enumerate(value)])
+    try:
+        yield stats
+    finally:
+        for attr, value in originals.items():
+            setattr(module, attr, value)
+
+
+def regex_report(stats):
+    total = sum(e["total_s"] for e in stats.values()) or 1.0
+    lines = [f"{'Regex':<22} | {'Panggilan':>9} | {'Total (s)':>9} | "
+             f"{'%':>5} | Pola", "-" * 90]
+    for name, e in sorted(stats.items(), key=lambda kv: -kv[1]["total_s"]):
+        lines.append(f"{name:<22} | {e['calls']:>9} | {e['total_s']:>9.3f} | "
+                     f"{100 * e['total_s'] / total:>5.1f} | {e['pattern'][:40]}")
+    return "\n".join(lines)
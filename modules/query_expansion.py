@@ -0,0 +1,70 @@
+# ============================================================
+# 🔁 QUERY EXPANSION — pseudo-relevance feedback (Rocchio)
+# ------------------------------------------------------------
+# Query pendek/samar ("sakit perut", "pusing terus") sering dapat
+# top-1 yang meleset. Tanpa panggilan model kedua:
+#   1) cari top-m dengan vektor query,
+#   2) q' = alpha·q + beta·mean(top-m corpus_emb), lalu normalisasi L2,
+#   3) cari ulang dengan q'.
+# Urutan hasil mengikuti q'; skor yang dilaporkan (dan threshold) tetap
+# cosine terhadap query ASLI, supaya kalibrasi/THRESHOLD tetap berlaku.
+# Hanya untuk query pendek (serving: MEDISEARCH_PRF_MAX_WORDS, default mati).
+# Ukur dampaknya: python -m modules.evaluasi --prf 3 --prf-max-words 5
+# ============================================================
+
+import numpy as np
+
+PRF_M = 3        # jumlah dokumen feedback
+PRF_ALPHA = 1.0
+PRF_BETA = 0.5
+
+
+def prf_applies(normalized_query, max_words):
+    """Gerbang PRF: query bersih 1..max_words kata (max_words 0 = mati)."""
+    return 0 < len(normalized_query.split()) <= max_words
+
+
+def rocchio(q_emb, feedback, alpha=PRF_ALPHA, beta=PRF_BETA):
+    """alpha·q + beta·centroid(feedback), dinormalisasi L2."""
+    if not len(feedback):
+        return q_emb
+    refined = alpha * q_emb + beta * np.asarray(feedback).mean(axis=0)
+    refined = refined / np.linalg.norm(refined)
+    return refined.astype(q_emb.dtype, copy=False)
+
+
+def rescore(hits_idx, rows, q_emb, min_score):
+    """Skor ulang terhadap query asli; urutan dipertahankan."""
+    orig = rows @ q_emb
+    return [(int(i), float(s)) for i, s in zip(hits_idx, orig) if s >= min_score]
+
+
+def prf_search(snap, q_emb, min_score, max_k, key=None, m=PRF_M,
+               alpha=PRF_ALPHA, beta=PRF_BETA, **search_kwargs):
+    """gated_search dengan PRF pada IndexSnapshot.
+
+    key (mis. teks query bersih) → q' di-cache di snapshot, jadi query
+    berulang tidak mengulang pass pertama. Feedback diambil dari scope
+    yang sama (category di search_kwargs). Format return = gated_search.
+    """
+    cache_key = ("prf", key, search_kwargs.get("category"), m, alpha, beta)
+    refined = snap.cache.get(cache_key) if key else None
+    if refined is None:
+        first = snap.gated_search(q_emb, -1.0, m, **search_kwargs)
+        fb_idx = [i for i, _ in first["hits"]]
+        refined = rocchio(q_emb, snap.embedding_rows(fb_idx), alpha, beta)
+        refined.setflags(write=False)
+        if key:
+            snap.cache.put(cache_key, refined)
+
+    second = snap.gated_search(refined, -1.0, max_k, **search_kwargs)
+    idx = [i for i, _ in second["hits"]]
+    ranked = rescore(idx, snap.embedding_rows(idx), q_emb, -1.0)
+    best_idx, best_score = ranked[0] if ranked else (second["best_idx"], -1.0)
+    return {
+        "hits": [(i, s) for i, s in ranked if s >= min_score],
+        "best_idx": best_idx,
+        "best_score": best_score,
+        "scanned": second["scanned"],
+        "early_exit": False,
+    }
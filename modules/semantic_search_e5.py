@@ -1,17 +1,26 @@
 # ============================================================
 # 🔥 TEST MANUAL — Cek hasil retrieval langsung (SAMA dengan Web App)
+# Jalankan dari root repo: python -m modules.semantic_search_e5 [--model e5-small]
 # ============================================================
 
+import argparse
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from modules.model_registry import add_model_arg, encode, get_spec, query_text
+from modules.text_cleaning import normalize_query
+
+parser = argparse.ArgumentParser(description="Test retrieval manual")
+add_model_arg(parser)
+SPEC = get_spec(parser.parse_args().model)
+
 # ------------------------------------------------------------
 # 1. Load model + embeddings (identik dengan web)
 # ------------------------------------------------------------
-print("🔍 Loading model E5...")
-model = SentenceTransformer("intfloat/multilingual-e5-base")
+print(f"🔍 Loading model {SPEC['model_name']}...")
+model = SentenceTransformer(SPEC["model_name"])
 
-data = np.load("embeddings_all.npz", allow_pickle=True)
+data = np.load(SPEC["emb_file"], allow_pickle=True)
 corpus_emb = data["corpus_embeddings"]
 answers    = data["answers"]
 questions  = data["questions"]
@@ -22,9 +31,8 @@ print("📌 Embeddings loaded:", len(questions), "QA pairs.\n")
 # 2. Retrieval versi terminal (identik dengan web)
 # ------------------------------------------------------------
 def retrieve_terminal(question):
-    pref = "query: " + question          # SAMA dgn web
-    q_emb = model.encode(pref, convert_to_numpy=True)
-    q_emb = q_emb / (np.linalg.norm(q_emb) + 1e-9)
+    pref = query_text(SPEC, normalize_query(question))   # SAMA dgn web
+    q_emb = encode(model, SPEC, pref)
 
     scores = np.dot(corpus_emb, q_emb)   # cosine similarity SAMA dgn web
     idx = scores.argmax()                # ambil TOP-1
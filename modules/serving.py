@@ -0,0 +1,458 @@
+# ============================================================
+# 🚦 SERVING — Preload model + index, warm-up, readiness
+# ------------------------------------------------------------
+# Query pertama setelah load_model() lambat (inisialisasi torch,
+# tokenizer, alokator). Modul ini:
+#   1) memuat model + index SEKALI per proses (dipakai app.py),
+#   2) menjalankan warm-up (encode dummy + search dummy) dan mencatat
+#      latency cold vs warm,
+#   3) melaporkan readiness lewat HTTP (/ready → 503 lalu 200) dan/atau
+#      file penanda, HANYA setelah warm-up selesai,
+#   4) endpoint POST /search (dipakai load test: modules/load_test.py).
+#
+# Launcher (preload SEBELUM ada user, lalu jalankan Streamlit di proses
+# yang sama):
+#   MEDISEARCH_READY_PORT=8600 python -m modules.serving
+#
+# Konfigurasi (environment):
+#   MEDISEARCH_MODEL=e5-base      → model default (model_registry.py)
+#   MEDISEARCH_MODELS=e5-base,e5-small → model yang di-preload + warm-up
+#                                   (hanya ini yang dilayani app / /search)
+#   MEDISEARCH_SHARED=1           → embedding di shared memory
+#   MEDISEARCH_COMPACTOR=1        → replika ini yang compaction otomatis
+#                                   (default: 1, atau 0 bila SHARED=1)
+#   MEDISEARCH_WARMUP_ROUNDS=3    → jumlah putaran warm-up (0 = mati)
+#   MEDISEARCH_READY_PORT=8600    → port HTTP readiness (kosong = mati)
+#   MEDISEARCH_READY_FILE=/tmp/x  → file ditulis saat siap (opsional)
+#   MEDISEARCH_WORKERS=2          → thread retrieval paralel (executor.py)
+#   MEDISEARCH_QUEUE=16           → maks request menunggu (lebih → ditolak)
+#   MEDISEARCH_INTRA_OP_THREADS=  → thread torch per proses (kosong = auto)
+#   MEDISEARCH_TIMEOUT=10         → timeout per request (detik)
+#   MEDISEARCH_COARSE_DIM=0       → >0: coarse search PCA (bench_coarse dulu)
+#   MEDISEARCH_SHORTLIST=200      → kandidat rescore untuk coarse search
+#   MEDISEARCH_PRF_MAX_WORDS=0    → >0: PRF untuk query <= N kata (evaluasi --prf dulu)
+# ============================================================
+
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from modules.executor import Overloaded, RequestTimeout, RetrievalExecutor
+from modules.live_index import LiveIndex
+from modules.model_registry import default_model, encode, get_spec, query_text
+from modules.query_expansion import prf_applies, prf_search
+from modules.shared_store import SharedStoreLoader
+from modules.store_meta import (
+    band_confidence, bound_calibration, get_manifest, meta_path, read_meta,
+    thresholds_from, verify_manifest,
+)
+from modules.text_cleaning import normalize_query
+
+# Contoh query representatif (berbeda-beda panjangnya)
+WARMUP_QUERIES = [
+    "demam tinggi 3 hari disertai batuk",
+    "Anak saya usia 2 tahun diare sejak kemarin, apakah perlu ke dokter?",
+    "kulit gatal dan kemerahan setelah makan udang",
+    "Saya sering sakit kepala sebelah kiri saat bangun tidur, disertai mual "
+    "dan pandangan kabur. Riwayat hipertensi. Apakah ini berbahaya?",
+    "nyeri ulu hati setelah makan pedas",
+]
+
+# Default exact: base di-scan per cluster (terdekat dulu) dengan early
+# exit HIGH_CONFIDENCE. Coarse-to-fine (skor PCA COARSE_DIM dimensi →
+# rescore SHORTLIST kandidat) menggantikan scan itu, jadi aktifkan hanya
+# bila python -m modules.bench_coarse di store asli menunjukkan
+# recall@K cukup (lihat rekomendasi di akhir output-nya).
+COARSE_DIM = int(os.environ.get("MEDISEARCH_COARSE_DIM", "0"))
+SHORTLIST = int(os.environ.get("MEDISEARCH_SHORTLIST", "200"))
+# Query pendek/samar: pseudo-relevance feedback (Rocchio), 0 = mati.
+# Default mati: PRF mengubah urutan hasil dan melewati early exit, jadi
+# aktifkan hanya bila evaluasi --prf --prf-max-words N di store asli
+# menunjukkan perbaikan pada populasi query itu.
+PRF_MAX_WORDS = int(os.environ.get("MEDISEARCH_PRF_MAX_WORDS", "0"))
+
+_lock = threading.Lock()  # hanya melindungi _building (singkat)
+_building = {}            # name → RLock per resource
+_resources = {}
+_ready = threading.Event()
+_report = {}
+
+
+# ============================================================
+# Resource per proses
+# ============================================================
+def _get(name, factory):
+    """Resource per proses, dibangun sekali.
+
+    Lock per resource: memuat model besar tidak memblok get_index /
+    get_executor sesi lain. RLock karena warm-up memanggil get_model().
+    """
+    if name in _resources:
+        return _resources[name]
+    with _lock:
+        lock = _building.setdefault(name, threading.RLock())
+    with lock:
+        if name not in _resources:
+            _resources[name] = factory()
+        return _resources[name]
+
+
+def get_model(key=None):
+    from sentence_transformers import SentenceTransformer
+    spec = get_spec(key)
+    return _get(f"model:{spec['key']}",
+                lambda: SentenceTransformer(spec["model_name"]))
+
+
+def get_index(key=None):
+    spec = get_spec(key)
+
+    def build():
+        # Base + delta segment; watcher menukar snapshot tanpa restart.
+        # MEDISEARCH_SHARED=1 → semua replika di host memakai satu salinan
+        # embedding + teks di shared memory (attach zero-copy).
+        loader = (SharedStoreLoader()
+                  if os.environ.get("MEDISEARCH_SHARED") == "1" else None)
+        # Manifest dicek setiap base dimuat: store dari model/prefix lain
+        # atau file rusak ditolak (watcher tetap memakai snapshot lama)
+        index = LiveIndex(
+            spec["emb_file"], spec["delta_dir"], loader=loader,
+            validate=lambda base: verify_manifest(
+                base, spec["model_name"], spec["prefixes"],
+                spec["normalization"]))
+        index.start_watcher(interval=5.0, auto_compact=is_compactor())
+        return index
+    return _get(f"index:{spec['key']}", build)
+
+
+def is_compactor():
+    """Apakah watcher proses ini boleh compaction otomatis.
+
+    Replika shared-memory (MEDISEARCH_SHARED=1) hanya compact bila
+    MEDISEARCH_COMPACTOR=1 (satu leader); proses tunggal: selalu.
+    LiveIndex.compact() tetap aman bila dua proses mencoba (store_lock).
+    """
+    default = "0" if os.environ.get("MEDISEARCH_SHARED") == "1" else "1"
+    return os.environ.get("MEDISEARCH_COMPACTOR", default) == "1"
+
+
+def encode_queries(texts, key=None):
+    """Normalisasi + prefix + encode sesuai model (tanpa cache)."""
+    spec = get_spec(key)
+    return encode(get_model(spec["key"]), spec,
+                  [query_text(spec, normalize_query(t)) for t in texts])
+
+
+def get_executor():
+    """Thread pool retrieval bersama semua sesi Streamlit di proses ini."""
+    def build():
+        intra_op = os.environ.get("MEDISEARCH_INTRA_OP_THREADS")
+        return RetrievalExecutor(
+            max_workers=int(os.environ.get("MEDISEARCH_WORKERS", "2")),
+            queue_size=int(os.environ.get("MEDISEARCH_QUEUE", "16")),
+            intra_op_threads=int(intra_op) if intra_op else None,
+            timeout=float(os.environ.get("MEDISEARCH_TIMEOUT", "10")),
+        )
+    return _get("executor", build)
+
+
+def get_calibration(key=None):
+    """Kalibrasi milik base yang sedang dilayani ({} bila tidak ada).
+
+    Dibaca ulang saat base berganti (build ulang / compaction) atau
+    sidecar ditulis ulang (kalibrasi baru), tanpa restart replika.
+    """
+    spec = get_spec(key)
+    snap = get_index(spec["key"]).snapshot()
+    path = meta_path(spec["emb_file"])
+    sig = (snap.base_sig, os.stat(path).st_mtime_ns if os.path.exists(path) else None)
+    name = f"calibration:{spec['key']}"
+    cached = _resources.get(name)
+    if cached is None or cached[0] != sig:
+        cached = (sig, bound_calibration(read_meta(spec["emb_file"]),
+                                         get_manifest(snap.base)))
+        _resources[name] = cached  # assignment atomik; race = hitung dua kali
+    return cached[1]
+
+
+def get_thresholds(key=None):
+    """Threshold terkalibrasi (modules/kalibrasi.py) atau default lama."""
+    return thresholds_from(get_calibration(key))
+
+
+def score_confidence(score, key=None):
+    """Presisi terkalibrasi untuk skor (None bila belum dikalibrasi)."""
+    return band_confidence(get_calibration(key), score)
+
+
+# ============================================================
+# Retrieval — satu jalur untuk app.py, POST /search dan load test
+# ============================================================
+@lru_cache(maxsize=1024)
+def encode_query(normalized, key):
+    """Embedding query yang sudah dinormalisasi (cache per teks bersih + model)."""
+    spec = get_spec(key)
+    q_emb = encode(get_model(key), spec, query_text(spec, normalized))
+    q_emb.setflags(write=False)  # dibagi antar request, jangan diubah
+    return q_emb
+
+
+def scope_category(snap, category):
+    """Store tanpa bitmap kategori (build lama) → cari di seluruh corpus."""
+    return category if category in snap.category_index else None
+
+
+def retrieve(query, min_score, max_k, high_confidence=None, model=None,
+             category=None):
+    """Gated retrieval: hanya hit >= min_score (maks max_k) yang dibentuk.
+
+    Query dibersihkan dengan cleaner yang sama seperti pertanyaan corpus.
+    Jawaban terbaik (best_idx/best_score) selalu dikembalikan, meskipun
+    di bawah min_score; best_idx -1 bila tidak ada baris yang di-scan
+    (kategori kosong). category → hanya baris spesialisasi itu.
+
+    Returns (result, snap) — satu snapshot konsisten per request.
+    """
+    key = get_spec(model)["key"]
+    snap = get_index(key).snapshot()
+    category = scope_category(snap, category)
+    normalized = normalize_query(query)
+    q_emb = encode_query(normalized, key)
+    if prf_applies(normalized, PRF_MAX_WORDS):
+        # q' di-cache per query di snapshot (lihat query_expansion.py)
+        result = prf_search(
+            snap, q_emb, min_score, max_k, key=normalized,
+            coarse_dim=COARSE_DIM, shortlist_size=SHORTLIST, category=category,
+        )
+    else:
+        result = snap.gated_search(
+            q_emb, min_score, max_k, high_confidence,
+            coarse_dim=COARSE_DIM, shortlist_size=SHORTLIST, category=category,
+        )
+    return result, snap
+
+
+def retrieve_batch(queries, min_score, max_k, model=None, category=None):
+    """Beberapa sub-pertanyaan: satu batch encode + satu matmul Q × corpus.
+
+    Returns (results, snap) — results satu dict per query, formatnya sama
+    dengan retrieve().
+    """
+    spec = get_spec(model)
+    snap = get_index(spec["key"]).snapshot()
+    q_embs = encode_queries(queries, spec["key"])
+    category = scope_category(snap, category)
+    return snap.search_batch(q_embs, min_score, max_k, category), snap
+
+
+def search(query, min_score=None, max_k=6, model=None, category=None):
+    """retrieve() via executor, hasil sebagai dict JSON.
+
+    Dipakai endpoint POST /search dan load test (modules/load_test.py).
+    model = key registry (None → default); category = key kategori
+    (None → seluruh corpus). ValueError bila kategori tidak ada di store.
+    """
+    thresholds = get_thresholds(model)
+    if min_score is None:
+        min_score = thresholds["relevant"]
+    if (category is not None
+            and category not in get_index(model).snapshot().category_index):
+        raise ValueError(f"Kategori '{category}' tidak ada di store")
+
+    result, snap = get_executor().run(
+        retrieve, query, min_score, max_k, thresholds["high"], model, category)
+    best = result["best_idx"]
+    return {
+        "model": get_spec(model)["key"],
+        "category": category,
+        "best_idx": int(best),
+        "best_score": float(result["best_score"]) if best >= 0 else None,
+        "best_answer": str(snap.answers[best]) if best >= 0 else None,
+        "hits": [{"idx": int(i), "score": float(sc)}
+                 for i, sc in result["hits"]],
+    }
+
+
+# ============================================================
+# Warm-up
+# ============================================================
+def warm_up(encode_fn, search_fn, queries=WARMUP_QUERIES, rounds=3):
+    """Encode + search dummy; return laporan latency (ms).
+
+    Putaran pertama = cold, putaran terakhir = warm.
+    """
+    per_round = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for q in queries:
+            search_fn(encode_fn(q))
+        per_round.append(1000 * (time.perf_counter() - t0) / len(queries))
+
+    return {
+        "rounds": rounds,
+        "queries_per_round": len(queries),
+        "cold_ms": round(per_round[0], 2) if per_round else None,
+        "warm_ms": round(per_round[-1], 2) if per_round else None,
+        "per_round_ms": [round(x, 2) for x in per_round],
+    }
+
+
+def preload_models():
+    """Key model yang di-preload (MEDISEARCH_MODELS, default: model default)."""
+    keys = os.environ.get("MEDISEARCH_MODELS", "")
+    return [k.strip() for k in keys.split(",") if k.strip()] or [default_model()]
+
+
+def warm_up_replica(rounds=None):
+    """Warm-up model + index milik proses ini, lalu tandai siap."""
+    def run():
+        n = rounds
+        if n is None:
+            n = int(os.environ.get("MEDISEARCH_WARMUP_ROUNDS", "3"))
+        get_executor()  # thread intra-op diatur sebelum warm-up
+
+        t0 = time.perf_counter()
+        report = {}
+        for key in preload_models():
+            index = get_index(key)
+
+            def search(q_emb):
+                snap = index.snapshot()
+                snap.gated_search(q_emb, 0.0, 6, coarse_dim=COARSE_DIM,
+                                  shortlist_size=SHORTLIST)  # = retrieve()
+                snap.search_batch(np.stack([q_emb, q_emb]), 0.0, 6)
+
+            # Tanpa cache query, supaya benar-benar menjalankan encoder
+            report[key] = warm_up(lambda text: encode_queries([text], key)[0],
+                                  search, rounds=n)
+        report["total_s"] = round(time.perf_counter() - t0, 2)
+        mark_ready(report)
+        print(f"🔥 Warm-up selesai: {json.dumps(report)}")
+        return report
+    return _get("warmup", run)
+
+
+# ============================================================
+# Readiness
+# ============================================================
+def mark_ready(report):
+    _report.clear()
+    _report.update(report)
+    _ready.set()
+
+    ready_file = os.environ.get("MEDISEARCH_READY_FILE")
+    if ready_file:
+        tmp_path = ready_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f)
+        os.replace(tmp_path, ready_file)
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """GET /ready (503 sampai warm-up selesai), GET /health, POST /search.
+
+    POST /search body: {"query": "...", "min_score": 0.85, "max_k": 6,
+                        "model": "e5-base", "category": "anak"}
+    """
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/ready":
+            if is_ready():
+                self._send_json(200, {"ready": True, "warmup": _report})
+            else:
+                self._send_json(503, {"ready": False})
+        elif self.path == "/health":
+            self._send_json(200, {"alive": True})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/search":
+            self._send_json(404, {"error": "not found"})
+            return
+        if not is_ready():
+            self._send_json(503, {"error": "not ready"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            query = str(body["query"])
+            min_score = body.get("min_score")
+            if min_score is not None:
+                min_score = float(min_score)
+            max_k = int(body.get("max_k", 6))
+            if max_k < 1:
+                raise ValueError("max_k harus >= 1")
+            model = body.get("model")
+            category = body.get("category")
+            if category is not None and not isinstance(category, str):
+                raise TypeError("category harus string atau null")
+            if get_spec(model)["key"] not in preload_models():
+                # Model di luar MEDISEARCH_MODELS belum di-warm-up
+                raise ValueError(f"model '{get_spec(model)['key']}' tidak di-preload")
+        except (KeyError, ValueError, TypeError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+        try:
+            self._send_json(200, search(query, min_score, max_k, model, category))
+        except ValueError as e:  # kategori tidak dikenal
+            self._send_json(400, {"error": f"bad request: {e}"})
+        except Overloaded as e:
+            self._send_json(503, {"error": str(e)})
+        except RequestTimeout as e:
+            self._send_json(504, {"error": str(e)})
+        except Exception as e:  # jangan putus koneksi tanpa jawaban
+            self._send_json(500, {"error": f"internal error: {e}"})
+
+    def log_message(self, format, *args):  # jangan spam log per probe
+        pass
+
+
+def start_http_server(port=None):
+    """Jalankan server HTTP di thread daemon (sekali per proses)."""
+    if port is None:
+        port = os.environ.get("MEDISEARCH_READY_PORT")
+    if not port:
+        return None
+
+    def build():
+        server = ThreadingHTTPServer(("0.0.0.0", int(port)), ApiHandler)
+        threading.Thread(target=server.serve_forever, name="http-api",
+                         daemon=True).start()
+        print(f"🚦 HTTP /ready, /health, /search di port {port}")
+        return server
+    return _get("http_server", build)
+
+
+# ============================================================
+# Launcher: preload + warm-up, lalu Streamlit di proses yang sama
+# ============================================================
+if __name__ == "__main__":
+    import sys
+    from streamlit.web import bootstrap
+
+    # Import ulang lewat nama paket: app.py memakai modules.serving,
+    # bukan __main__, jadi resource harus dimuat di instance itu.
+    from modules import serving
+
+    serving.start_http_server()   # /ready = 503 selama loading
+    serving.warm_up_replica()     # model + index + warm-up → ready
+                                  # (semua model di MEDISEARCH_MODELS)
+    bootstrap.run("app.py", False, sys.argv[1:], {})
@@ -0,0 +1,244 @@
+# ============================================================
+# 🧠 SHARED STORE — Satu salinan embedding untuk banyak worker
+# ------------------------------------------------------------
+# Worker pertama mem-publish isi embeddings_all.npz ke folder di
+# /dev/shm (RAM, shared mmap file):
+#   <array>.npy                     → array numerik (mmap, zero-copy)
+#   <array>.txt.bin + .txt.off.npy  → teks UTF-8 + offsets (tanpa pickle)
+# Worker lain hanya meng-attach (np.load mmap_mode="r"), jadi halaman
+# memori dipakai bersama oleh semua proses.
+#
+# Reference counting: file `refs` berisi PID yang sedang attach
+# (dilindungi flock). PID yang sudah mati dibuang otomatis; worker
+# terakhir yang detach menghapus folder + file refs/lock. Store milik
+# replika yang mati (SIGKILL, tanpa detach) disapu saat attach berikutnya.
+# ============================================================
+
+import atexit
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+SHM_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+PREFIX = "medisearch_"
+
+
+# ============================================================
+# Teks tanpa pickle: blob UTF-8 + offsets
+# ============================================================
+class TextBlob:
+    """Array teks read-only di atas buffer bytes + offsets (mmap)."""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, texts):
+        encoded = [str(t).encode("utf-8") for t in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_array(self):
+        return np.array(list(self), dtype=object)
+
+
+# ============================================================
+# Publish / attach / detach
+# ============================================================
+def store_key(emb_file):
+    """Kunci unik per isi file (path + mtime + ukuran)."""
+    st = os.stat(emb_file)
+    raw = f"{os.path.abspath(emb_file)}:{st.st_mtime_ns}:{st.st_size}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+@contextmanager
+def _locked(path):
+    # File lock ikut dihapus saat store dibersihkan: setelah dapat lock,
+    # pastikan path masih menunjuk file yang sama (bukan inode yatim)
+    while True:
+        f = open(path, "a+")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            same = os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            same = False
+        if same:
+            break
+        f.close()
+    try:
+        yield
+    finally:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_refs(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [int(x) for x in f.read().split()]
+
+
+def _write_refs(path, pids):
+    with open(path, "w") as f:
+        f.write("\n".join(str(p) for p in pids))
+
+
+def _publish(emb_file, store_dir):
+    """Tulis semua array ke folder sementara lalu rename (atomik)."""
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=SHM_ROOT)
+    with np.load(emb_file, allow_pickle=True) as data:
+        for key in data.files:
+            value = data[key]
+            if value.dtype == object:
+                blob = TextBlob.build(value)
+                blob.data.tofile(os.path.join(tmp_dir, f"{key}.txt.bin"))
+                np.save(os.path.join(tmp_dir, f"{key}.txt.off.npy"), blob.offsets)
+            else:
+                np.save(os.path.join(tmp_dir, f"{key}.npy"), value)
+    os.rename(tmp_dir, store_dir)
+
+
+def _open(store_dir):
+    arrays = {}
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name.endswith(".txt.bin"):
+            key = name[:-len(".txt.bin")]
+            offsets = np.load(os.path.join(store_dir, f"{key}.txt.off.npy"))
+            data = (np.memmap(path, dtype=np.uint8, mode="r")
+                    if os.path.getsize(path) else np.empty(0, dtype=np.uint8))
+            arrays[key] = TextBlob(data, offsets)
+        elif name.endswith(".npy") and not name.endswith(".txt.off.npy"):
+            arrays[name[:-len(".npy")]] = np.load(path, mmap_mode="r")
+    return arrays
+
+
+def _remove_store(store_dir):
+    """Hapus folder + refs + lock (pemanggil memegang lock-nya)."""
+    # mmap yang masih terbuka tetap valid setelah file dihapus
+    shutil.rmtree(store_dir, ignore_errors=True)
+    for path in (store_dir + ".refs", store_dir + ".lock"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def sweep_dead(keep=None):
+    """Hapus store yang semua PID di refs-nya sudah mati.
+
+    Termasuk sisa lock/refs tanpa folder. Return jumlah store dihapus.
+    """
+    stores = set()
+    for name in os.listdir(SHM_ROOT):
+        if not name.startswith(PREFIX):
+            continue
+        for suffix in (".lock", ".refs"):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        stores.add(name)
+
+    removed = 0
+    for name in sorted(stores):
+        if name == PREFIX + str(keep):
+            continue
+        store_dir = os.path.join(SHM_ROOT, name)
+        with _locked(store_dir + ".lock"):
+            if any(_pid_alive(p) for p in _read_refs(store_dir + ".refs")):
+                continue
+            _remove_store(store_dir)
+            removed += 1
+    return removed
+
+
+def attach(emb_file):
+    """Attach ke shared store untuk emb_file (publish bila belum ada).
+
+    Returns:
+        (key, arrays) — arrays berisi memmap / TextBlob, zero-copy.
+    """
+    key = store_key(emb_file)
+    store_dir = os.path.join(SHM_ROOT, PREFIX + key)
+    refs_path = store_dir + ".refs"
+    sweep_dead(keep=key)
+
+    with _locked(store_dir + ".lock"):
+        if not os.path.isdir(store_dir):
+            _publish(emb_file, store_dir)
+        pids = [p for p in _read_refs(refs_path) if _pid_alive(p)]
+        _write_refs(refs_path, pids + [os.getpid()])
+        return key, _open(store_dir)
+
+
+def detach(key):
+    """Lepas satu referensi; worker terakhir menghapus store."""
+    store_dir = os.path.join(SHM_ROOT, PREFIX + key)
+    refs_path = store_dir + ".refs"
+
+    with _locked(store_dir + ".lock"):
+        pids = [p for p in _read_refs(refs_path) if _pid_alive(p)]
+        if os.getpid() in pids:
+            pids.remove(os.getpid())
+        if pids:
+            _write_refs(refs_path, pids)
+            return False
+        _remove_store(store_dir)
+        return True
+
+
+class SharedStoreLoader:
+    """Loader base untuk LiveIndex: attach shared store, bukan np.load.
+
+    Saat base berganti (mis. setelah compaction) store lama di-detach;
+    semua store di-detach otomatis saat proses keluar.
+    """
+
+    def __init__(self):
+        self.key = None
+        atexit.register(self.close)
+
+    def __call__(self, emb_file):
+        key, arrays = attach(emb_file)
+        if self.key is not None and self.key != key:
+            detach(self.key)
+        elif self.key == key:
+            detach(key)  # attach ulang store yang sama: refcount tetap 1
+        self.key = key
+        return arrays
+
+    def close(self):
+        if self.key is not None:
+            detach(self.key)
+            self.key = None
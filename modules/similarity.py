@@ -0,0 +1,265 @@
+# ============================================================
+# ⚡ SIMILARITY ENGINE — Blocked (tiled) Query × Corpus
+# Untuk analisis offline: evaluasi full-dataset, deteksi duplikat,
+# kalibrasi threshold. Matriks Q×N penuh TIDAK pernah dibentuk:
+# skor dihitung per blok, hanya top-K / hit threshold yang disimpan.
+# ============================================================
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BLOCK_SIZE = 1024
+
+
+def iter_blocks(n, block_size=BLOCK_SIZE):
+    """Yield (start, stop) untuk blok berukuran tetap."""
+    for start in range(0, n, block_size):
+        yield start, min(start + block_size, n)
+
+
+def _as_matrix(x):
+    x = np.asarray(x, dtype=np.float32)
+    if x.ndim == 1:
+        x = x[None, :]
+    return x
+
+
+def _run_query_blocks(fn, n_queries, block_size, n_workers):
+    """Jalankan fn(q0, q1) untuk tiap blok query, opsional paralel.
+
+    BLAS melepas GIL saat perkalian matriks, jadi thread pool cukup
+    untuk memakai banyak core tanpa menyalin data ke proses lain.
+    """
+    blocks = list(iter_blocks(n_queries, block_size))
+    if n_workers <= 1 or len(blocks) <= 1:
+        return [fn(q0, q1) for q0, q1 in blocks]
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(lambda b: fn(*b), blocks))
+
+
+def blocked_topk(queries, corpus, k=10, block_size=BLOCK_SIZE,
+                 n_workers=1, exclude_self=False):
+    """Top-K corpus untuk setiap query, dihitung per blok.
+
+    Memori kerja per worker: block_size × (block_size + k) float32,
+    konstan terhadap ukuran corpus.
+
+    Returns:
+        (indices, scores) berukuran (Q, k), terurut menurun per baris.
+    """
+    Q = _as_matrix(queries)
+    C = _as_matrix(corpus)
+    k = min(k, len(C))
+
+    def run(q0, q1):
+        qb = Q[q0:q1]
+        best_s = np.full((len(qb), 0), -np.inf, dtype=np.float32)
+        best_i = np.empty((len(qb), 0), dtype=np.int64)
+
+        for c0, c1 in iter_blocks(len(C), block_size):
+            s = qb @ C[c0:c1].T
+            if exclude_self:
+                _mask_diagonal(s, q0, c0)
+
+            cand_s = np.concatenate([best_s, s], axis=1)
+            cand_i = np.concatenate(
+                [best_i, np.broadcast_to(np.arange(c0, c1), s.shape)], axis=1
+            )
+            if cand_s.shape[1] > k:
+                part = np.argpartition(-cand_s, k - 1, axis=1)[:, :k]
+                cand_s = np.take_along_axis(cand_s, part, axis=1)
+                cand_i = np.take_along_axis(cand_i, part, axis=1)
+            best_s, best_i = cand_s, cand_i
+
+        order = np.argsort(-best_s, axis=1)
+        return (np.take_along_axis(best_i, order, axis=1),
+                np.take_along_axis(best_s, order, axis=1))
+
+    results = _run_query_blocks(run, len(Q), block_size, n_workers)
+    if not results:
+        return (np.empty((0, k), dtype=np.int64),
+                np.empty((0, k), dtype=np.float32))
+    return (np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]))
+
+
+def blocked_threshold_hits(queries, corpus, threshold, block_size=BLOCK_SIZE,
+                           n_workers=1, exclude_self=False):
+    """Semua pasangan (query, corpus) dengan skor >= threshold.
+
+    Returns:
+        (query_idx, corpus_idx, scores) — array 1D sepanjang jumlah hit.
+    """
+    Q = _as_matrix(queries)
+    C = _as_matrix(corpus)
+
+    def run(q0, q1):
+        qb = Q[q0:q1]
+        hits_q, hits_c, hits_s = [], [], []
+        for c0, c1 in iter_blocks(len(C), block_size):
+            s = qb @ C[c0:c1].T
+            if exclude_self:
+                _mask_diagonal(s, q0, c0)
+            r, c = np.nonzero(s >= threshold)
+            if len(r):
+                hits_q.append(r + q0)
+                hits_c.append(c + c0)
+                hits_s.append(s[r, c])
+        return hits_q, hits_c, hits_s
+
+    results = _run_query_blocks(run, len(Q), block_size, n_workers)
+    parts_q = [a for r in results for a in r[0]]
+    parts_c = [a for r in results for a in r[1]]
+    parts_s = [a for r in results for a in r[2]]
+    if not parts_q:
+        return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.float32))
+    return (np.concatenate(parts_q), np.concatenate(parts_c),
+            np.concatenate(parts_s))
+
+
+# ============================================================
+# Gated retrieval — hanya hit >= min_score, dengan early exit
+# ============================================================
+def iter_matrix_blocks(matrix, offset=0, ranges=None, block_size=BLOCK_SIZE):
+    """Yield (row_offset, blok) dari matrix, opsional hanya pada ranges."""
+    if ranges is None:
+        ranges = [(0, len(matrix))]
+    for r0, r1 in ranges:
+        for c0, c1 in iter_blocks(r1 - r0, block_size):
+            yield offset + r0 + c0, matrix[r0 + c0:r0 + c1]
+
+
+def gated_search(blocks, q_emb, min_score, max_k, high_confidence=None):
+    """Cari hingga max_k hit dengan skor >= min_score.
+
+    blocks: iterable (rows, matrix_block) dalam urutan scan; rows adalah
+            offset baris pertama (int) atau array indeks baris (shortlist).
+    Bila high_confidence diberikan dan corpus sudah terurut (mis. per
+    cluster, cluster terdekat lebih dulu), scan berhenti begitu max_k
+    hit >= high_confidence ditemukan.
+
+    Returns dict:
+        hits       — list (idx, score) terurut menurun, maks max_k
+        best_idx   — indeks skor tertinggi yang di-scan (selalu ada)
+        best_score — skornya
+        scanned    — jumlah baris yang di-scan
+        early_exit — True bila scan berhenti sebelum habis
+    """
+    hit_idx, hit_scores = [], []
+    best_idx, best_score = -1, -np.inf
+    n_confident = 0
+    scanned = 0
+    early_exit = False
+
+    for rows, block in blocks:
+        s = block @ q_emb
+        scanned += len(s)
+        if not len(s):
+            continue
+        if not isinstance(rows, np.ndarray):
+            rows = np.arange(rows, rows + len(s))
+
+        j = int(s.argmax())
+        if s[j] > best_score:
+            best_idx, best_score = int(rows[j]), float(s[j])
+
+        sel = np.flatnonzero(s >= min_score)
+        if len(sel):
+            hit_idx.append(rows[sel])
+            hit_scores.append(s[sel])
+            if high_confidence is not None:
+                n_confident += int(np.count_nonzero(s[sel] >= high_confidence))
+                if n_confident >= max_k:
+                    early_exit = True
+                    break
+
+    hits = []
+    if hit_idx:
+        idx = np.concatenate(hit_idx)
+        sc = np.concatenate(hit_scores)
+        if len(sc) > max_k:
+            part = np.argpartition(-sc, max_k - 1)[:max_k]
+            idx, sc = idx[part], sc[part]
+        order = np.argsort(-sc)
+        hits = [(int(i), float(v)) for i, v in zip(idx[order], sc[order])]
+
+    return {
+        "hits": hits,
+        "best_idx": best_idx,
+        "best_score": best_score,
+        "scanned": scanned,
+        "early_exit": early_exit,
+    }
+
+
+def cluster_order(emb, n_clusters=64, n_iter=10, seed=0):
+    """Spherical k-means sederhana untuk mengurutkan corpus per cluster.
+
+    Returns:
+        perm      — urutan baris baru (baris cluster 0, lalu 1, ...)
+        offsets   — batas cluster pada urutan baru, panjang n_clusters+1
+        centroids — centroid ternormalisasi, (n_clusters, dim)
+    """
+    X = np.asarray(emb, dtype=np.float32)
+    n_clusters = max(1, min(n_clusters, len(X)))
+    rng = np.random.default_rng(seed)
+    centroids = X[rng.choice(len(X), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = blocked_topk(X, centroids, k=1)[0][:, 0]
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, X)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        filled = norms[:, 0] > 0  # cluster kosong: centroid lama dipertahankan
+        centroids[filled] = sums[filled] / norms[filled]
+
+    labels = blocked_topk(X, centroids, k=1)[0][:, 0]
+    perm = np.argsort(labels, kind="stable")
+    counts = np.bincount(labels, minlength=n_clusters)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return perm, offsets, centroids
+
+
+def _mask_diagonal(s, q0, c0):
+    """Buang skor query i vs corpus i (untuk corpus × corpus)."""
+    rows = np.arange(s.shape[0])
+    cols = rows + q0 - c0
+    ok = (cols >= 0) & (cols < s.shape[1])
+    s[rows[ok], cols[ok]] = -np.inf
+
+
+# ============================================================
+# CLI — Deteksi duplikat jawaban di corpus
+# ============================================================
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Deteksi jawaban duplikat")
+    parser.add_argument("--emb-file", default="embeddings_all.npz")
+    parser.add_argument("--threshold", type=float, default=0.98)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    data = np.load(args.emb_file, allow_pickle=True)
+    corpus_emb = data["corpus_embeddings"]
+    answers = data["answers"]
+
+    start_time = time.time()
+    qi, ci, sc = blocked_threshold_hits(
+        corpus_emb, corpus_emb, args.threshold,
+        block_size=args.block_size, n_workers=args.workers,
+        exclude_self=True,
+    )
+    keep = qi < ci  # setiap pasangan cukup sekali
+    qi, ci, sc = qi[keep], ci[keep], sc[keep]
+
+    print(f"🔁 Pasangan duplikat (skor >= {args.threshold}): {len(qi)}")
+    for i in np.argsort(-sc)[:10]:
+        print(f"\n[{qi[i]}] vs [{ci[i]}]  skor {sc[i]:.4f}")
+        print("  A:", str(answers[qi[i]])[:100])
+        print("  B:", str(answers[ci[i]])[:100])
+    print(f"\n⏱ Waktu: {round(time.time() - start_time, 2)} detik")
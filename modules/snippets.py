@@ -0,0 +1,101 @@
+# ============================================================
+# ✂️ SNIPPETS — preview + fragmen HTML jawaban, dihitung saat build
+# ------------------------------------------------------------
+# Dulu app.py memotong preview 100 karakter (rfind "." / " ") dan
+# menyisipkan teks jawaban MENTAH ke HTML di setiap rerun. Sekarang
+# embedding_model.py menyimpan di store:
+#   answers_html          uint8  — semua jawaban, sudah di-escape (UTF-8)
+#   answers_html_offsets  int64  — awal/akhir tiap jawaban (n + 1)
+#   answers_preview_end   int64  — akhir preview (byte) per jawaban,
+#                                  -1 = jawaban pendek (tanpa preview)
+# html.escape bekerja per karakter, jadi preview yang di-escape adalah
+# prefix dari jawaban yang di-escape: cukup satu blob + offset.
+# Baris delta / store lama: dihitung on-the-fly dengan fungsi yang sama.
+# ============================================================
+
+import html
+
+import numpy as np
+
+PREVIEW_CHARS = 100
+SNIPPET_KEYS = ("answers_html", "answers_html_offsets", "answers_preview_end")
+
+
+def preview_cutoff(text, limit=PREVIEW_CHARS):
+    """Potongan preview (kalimat/kata utuh); None bila teks <= limit."""
+    if len(text) <= limit:
+        return None
+    snippet = text[:limit]
+    if "." in snippet:
+        return snippet.rfind(".") + 1
+    if " " in snippet:
+        return snippet.rfind(" ") + 1
+    return limit
+
+
+def escape_text(text):
+    return html.escape(text).replace("\n", "<br>")
+
+
+def render_snippet(text):
+    """(html_lengkap, html_preview atau None) untuk satu jawaban."""
+    text = str(text).strip()
+    full = escape_text(text)
+    cutoff = preview_cutoff(text)
+    if cutoff is None:
+        return full, None
+    return full, escape_text(text[:cutoff].rstrip()) + "..."
+
+
+def build_snippet_arrays(answers):
+    """Array SNIPPET_KEYS untuk disimpan bersama embedding."""
+    chunks, offsets, preview_end = [], [0], []
+    pos = 0
+    for text in answers:
+        text = str(text).strip()
+        data = escape_text(text).encode("utf-8")
+        cutoff = preview_cutoff(text)
+        if cutoff is None:
+            preview_end.append(-1)
+        else:
+            head = escape_text(text[:cutoff].rstrip()).encode("utf-8")
+            preview_end.append(pos + len(head))
+        chunks.append(data)
+        pos += len(data)
+        offsets.append(pos)
+    return {
+        "answers_html": np.frombuffer(b"".join(chunks), dtype=np.uint8).copy(),
+        "answers_html_offsets": np.array(offsets, dtype=np.int64),
+        "answers_preview_end": np.array(preview_end, dtype=np.int64),
+    }
+
+
+class Snippets:
+    """Lookup fragmen HTML per baris global (base dari store, sisanya on-the-fly)."""
+
+    def __init__(self, base, answers):
+        self.answers = answers  # RowText base + delta
+        if all(k in base for k in SNIPPET_KEYS):
+            self.blob = base["answers_html"]
+            self.offsets = base["answers_html_offsets"]
+            self.preview_end = base["answers_preview_end"]
+            self.n_stored = len(self.offsets) - 1
+        else:
+            self.n_stored = 0
+
+    def _slice(self, start, end):
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    def answer_html(self, i):
+        i = int(i)
+        if i < self.n_stored:
+            return self._slice(self.offsets[i], self.offsets[i + 1])
+        return render_snippet(self.answers[i])[0]
+
+    def preview_html(self, i):
+        """Preview ter-escape + "..."; None bila jawaban pendek."""
+        i = int(i)
+        if i < self.n_stored:
+            end = self.preview_end[i]
+            return None if end < 0 else self._slice(self.offsets[i], end) + "..."
+        return render_snippet(self.answers[i])[1]
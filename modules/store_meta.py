@@ -0,0 +1,271 @@
+# ============================================================
+# 🗂 STORE METADATA — manifest + file JSON pendamping
+# ------------------------------------------------------------
+# Manifest (key "manifest" DI DALAM embeddings_all.npz, string JSON):
+#   model, prefix, normalisasi, dimensi, dtype, jumlah baris, sha256
+#   per array, fingerprint dataset sumber, parameter build, waktu build.
+#   Karena satu file dengan datanya, manifest ikut terganti secara
+#   atomik (tmp → os.replace) dan tidak pernah "basi".
+#
+# Sidecar (embeddings_all.meta.json): hasil job terpisah, mis.
+#   kalibrasi threshold, terikat ke store lewat lineage_id manifest
+#   (store_id build asal; dibawa terus oleh compaction).
+# ============================================================
+
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+MANIFEST_KEY = "manifest"
+MANIFEST_VERSION = 1
+
+# Skema E5: prefix wajib + embedding dinormalisasi L2 (dot = cosine)
+DEFAULT_PREFIXES = {"query": "query: ", "passage": "passage: "}
+NORMALIZATION = "l2"
+
+# Default bila belum ada kalibrasi (nilai lama di app.py / evaluasi.py)
+DEFAULT_THRESHOLDS = {
+    "relevant": 0.85,   # THRESHOLD — kandidat dianggap relevan
+    "high": 0.9,        # "Sangat Relevan" + batas early exit
+}
+
+
+def meta_path(emb_file):
+    return os.path.splitext(emb_file)[0] + ".meta.json"
+
+
+def read_meta(emb_file):
+    path = meta_path(emb_file)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_meta(emb_file, meta):
+    """Tulis metadata secara atomik (tmp → os.replace)."""
+    path = meta_path(emb_file)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def update_meta(emb_file, **sections):
+    meta = read_meta(emb_file)
+    meta.update(sections)
+    write_meta(emb_file, meta)
+    return meta
+
+
+def lineage_id(manifest):
+    """Id build asal store: tetap sama lewat compaction / tag ulang,
+    berubah saat embedding dibangun ulang. None untuk store lama."""
+    if manifest is None:
+        return None
+    return manifest["inputs"].get("lineage_id", manifest["store_id"])
+
+
+def bound_calibration(meta, manifest):
+    """Kalibrasi di sidecar bila milik store ini (lineage sama), else {}.
+
+    Compaction menambah baris tanpa mengubah distribusi skor, jadi
+    kalibrasi tetap berlaku; build ulang → diabaikan (kalibrasi ulang).
+    """
+    calib = meta.get("calibration", {})
+    if calib.get("lineage_id", calib.get("store_id")) != lineage_id(manifest):
+        return {}
+    return calib
+
+
+def thresholds_from(calibration):
+    """Threshold dari kalibrasi, fallback ke DEFAULT_THRESHOLDS.
+
+    Selalu high >= relevant.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for name, value in calibration.get("thresholds", {}).items():
+        if value is not None:
+            thresholds[name] = float(value)
+    # Campuran terkalibrasi + default (kalibrasi lama) bisa terbalik;
+    # "Sangat Relevan" / batas early exit tidak boleh di bawah min_score
+    thresholds["high"] = max(thresholds["high"], thresholds["relevant"])
+    return thresholds
+
+
+def load_thresholds(emb_file):
+    """Threshold terkalibrasi untuk store di emb_file (lihat thresholds_from)."""
+    return thresholds_from(
+        bound_calibration(read_meta(emb_file), read_manifest(emb_file)))
+
+
+def band_confidence(calibration, score):
+    """Presisi terkalibrasi untuk skor ini (None bila belum dikalibrasi).
+
+    calibration: hasil bound_calibration (kalibrasi store lain → {}).
+    """
+    for band in calibration.get("bands", []):
+        if band["lo"] <= score < band["hi"]:
+            return band["precision"]
+    return None
+
+
+# ============================================================
+# Manifest
+# ============================================================
+class StoreMismatchError(ValueError):
+    """Store tidak cocok dengan manifest / konfigurasi yang diharapkan."""
+
+
+def array_sha256(value):
+    """sha256 isi array; teks = UTF-8 per baris + "\\0".
+
+    TextBlob (shared store) di-hash langsung dari blob + offsets, tanpa
+    membuat string Python — hasilnya sama dengan array object-nya.
+    Array numerik di-hash dari buffer-nya (memmap tidak disalin).
+    """
+    h = hashlib.sha256()
+    if hasattr(value, "to_array"):  # TextBlob
+        data, offsets = value.data, value.offsets
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            h.update(data[start:end])
+            h.update(b"\0")
+    elif value.dtype == object:
+        for item in value.ravel():
+            h.update(str(item).encode("utf-8") + b"\0")
+    else:
+        h.update(f"{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).reshape(-1).view(np.uint8))
+    return h.hexdigest()
+
+
+def _shape_dtype(value):
+    if hasattr(value, "to_array"):  # TextBlob: teks per baris
+        return [len(value)], np.dtype(object).str
+    return list(value.shape), value.dtype.str
+
+
+def dataset_fingerprint(questions, answers):
+    """sha256 isi dataset (bukan file), sama untuk .xlsx/.parquet."""
+    h = hashlib.sha256()
+    for q, a in zip(questions, answers):
+        h.update(q.encode("utf-8") + b"\0" + a.encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+def build_manifest(arrays, model_name, inputs, prefixes=DEFAULT_PREFIXES,
+                   normalization=NORMALIZATION):
+    """Manifest untuk dict array (tanpa key manifest itu sendiri)."""
+    corpus = arrays["corpus_embeddings"]
+    checksums = {key: array_sha256(value) for key, value in sorted(arrays.items())
+                 if key != MANIFEST_KEY}
+    return {
+        "version": MANIFEST_VERSION,
+        "store_id": hashlib.sha256(
+            json.dumps(checksums, sort_keys=True).encode()).hexdigest()[:16],
+        "model_name": model_name,
+        "prefixes": dict(prefixes),
+        "normalization": normalization,
+        "dim": int(corpus.shape[1]),
+        "dtype": corpus.dtype.str,
+        "n_rows": int(corpus.shape[0]),
+        "inputs": inputs,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "arrays": {
+            key: dict(zip(("shape", "dtype"), _shape_dtype(arrays[key])),
+                      sha256=checksum)
+            for key, checksum in checksums.items()
+        },
+    }
+
+
+def with_manifest(arrays, manifest):
+    out = dict(arrays)
+    out[MANIFEST_KEY] = np.array(json.dumps(manifest, ensure_ascii=False))
+    return out
+
+
+def get_manifest(arrays):
+    """Manifest dari dict array / NpzFile; None untuk store lama."""
+    if MANIFEST_KEY not in arrays:
+        return None
+    return json.loads(str(arrays[MANIFEST_KEY][()]))
+
+
+def read_manifest(emb_file):
+    if not os.path.exists(emb_file):
+        return None
+    with np.load(emb_file, allow_pickle=False) as data:
+        return get_manifest(data)
+
+
+def store_id_of(emb_file):
+    manifest = read_manifest(emb_file)
+    return manifest["store_id"] if manifest else None
+
+
+@contextmanager
+def store_lock(emb_file):
+    """flock antar-proses untuk semua penulis store (emb_file + ".lock").
+
+    Build, tag ulang dan compaction (app, CLI, replika lain) memegang
+    lock ini selama membaca-lalu-menimpa base, supaya tidak saling timpa.
+    """
+    with open(emb_file + ".lock", "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def save_store(emb_file, arrays, manifest):
+    """Tulis store + manifest ke file sementara lalu os.replace (atomik)."""
+    if manifest is not None:
+        arrays = with_manifest(arrays, manifest)
+    tmp_path = emb_file + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, emb_file)
+
+
+def verify_manifest(arrays, model_name=None, prefixes=DEFAULT_PREFIXES,
+                    normalization=NORMALIZATION, checksums=True):
+    """Validasi array yang dimuat terhadap manifest-nya.
+
+    Return manifest; None bila store lama tanpa manifest (diberi warning).
+    Raise StoreMismatchError bila model/prefix/normalisasi berbeda, array
+    hilang, bentuk/dtype berubah, atau checksum tidak cocok.
+    """
+    manifest = get_manifest(arrays)
+    if manifest is None:
+        print("⚠️ Store tanpa manifest — bangun ulang dengan "
+              "python -m modules.embedding_model")
+        return None
+
+    def fail(msg):
+        raise StoreMismatchError(f"Embedding store tidak valid: {msg}")
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        fail(f"versi manifest {manifest.get('version')} tidak didukung")
+    if model_name is not None and manifest["model_name"] != model_name:
+        fail(f"dibangun dengan {manifest['model_name']}, bukan {model_name}")
+    if manifest["prefixes"] != dict(prefixes):
+        fail(f"prefix {manifest['prefixes']} != {dict(prefixes)}")
+    if manifest["normalization"] != normalization:
+        fail(f"normalisasi {manifest['normalization']} != {normalization}")
+
+    for key, spec in manifest["arrays"].items():
+        if key not in arrays:
+            fail(f"array '{key}' hilang")
+        value = arrays[key]
+        shape, dtype = _shape_dtype(value)
+        if shape != spec["shape"] or dtype != spec["dtype"]:
+            fail(f"'{key}' {shape}/{dtype} != {spec['shape']}/{spec['dtype']}")
+        if checksums and array_sha256(value) != spec["sha256"]:
+            fail(f"checksum '{key}' tidak cocok")
+    return manifest
@@ -0,0 +1,253 @@
+# ============================================================
+# 🧽 TEXT CLEANING — Cleaner Question/Answer (tanpa side effect)
+# ------------------------------------------------------------
+# Dipakai oleh preprocessing.py (corpus) DAN saat query (app.py,
+# semantic_search_e5.py), sehingga query dibersihkan persis seperti
+# pertanyaan di corpus. Import modul ini TIDAK menjalankan pipeline.
+# Semua regex di-compile sekali di level modul.
+# ============================================================
+
+import re
+from functools import lru_cache
+
+_RE_NEWLINES      = re.compile(r"[\r\n]+")
+_RE_PUNCT_NEWLINE = re.compile(r"([.!?])\s*[\r\n]+\s*")
+_RE_MULTI_SPACE   = re.compile(r"\s{2,}")
+_RE_PUNCT_SPACING = re.compile(r"\s*([,.;:!?])\s*")
+_RE_MULTI_DOTS    = re.compile(r"\.{2,}")
+_RE_SPACE_BEFORE  = re.compile(r"\s+([,.;:!?])")
+_RE_PUNCT_NOSPACE = re.compile(r"([,.;:!?])(?=\S)")
+_RE_DISALLOWED    = re.compile(r"[^a-zA-Z0-9À-ÿ\s\.,;:!?%()\-\']")
+_RE_ALODOKTER     = re.compile(r"\b(di|kepada|pada)\s*alodokter\b", re.IGNORECASE)
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+WORD_RE           = re.compile(r"\w+")
+
+
+# ============================================================
+#   📌 BAGIAN YANG SAMA UNTUK KEDUA VERSI
+# ============================================================
+def tidy_punct(text: str) -> str:
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.replace("/", " ")
+    text = _RE_NEWLINES.sub(". ", text)
+    text = _RE_MULTI_SPACE.sub(" ", text)
+    text = _RE_PUNCT_SPACING.sub(r"\1 ", text)
+    text = _RE_MULTI_DOTS.sub(".", text)
+    text = _RE_MULTI_SPACE.sub(" ", text)
+    text = _RE_SPACE_BEFORE.sub(r"\1", text)
+    text = _RE_PUNCT_NOSPACE.sub(r"\1 ", text)
+    return text.strip()
+
+
+def split_sentences(text: str) -> list:
+    """Pecah teks menjadi kalimat (setelah . ! ?)."""
+    return SENTENCE_SPLIT_RE.split(text)
+
+
+# ============================================================
+# INTRO PATTERN
+# ============================================================
+intro_keyword_patterns = [
+    r"^\s*(assalamualaikum|assalamu'alaikum|waalaikumsalam)\b",
+    r"^\s*(halo|hai|alo|permisi|selamat\s+(pagi|siang|sore|malam))\b",
+    r"^\s*(dok|dokter)\b",
+    r"^\s*(nama\s*saya|perkenalkan)\b",
+    r"^\s*(saya)\s+(ingin|mau|akan|ingin\s*bertanya|mau\s*bertanya)\b",
+    r"^\s*(mohon|minta|tolong)\b",
+    r"^\s*(terima\s*kasih|makasih)\b",
+    r"^\s*(untuk\s*pertanyaan\s*anda|berdasarkan\s*pertanyaan\s*anda|menjawab\s*pertanyaan)\b",
+    r"^\s*(sebelumnya\s*terima\s*kasih|sebelumnya\s*maaf)\b",
+    r"^\s*(pertanyaan\s*anda|anda\s*bertanya)\b",
+    r"^\s*(salam(?:\s+hormat|\s+sehat)?)\b",
+    r"^\s*(bertanya|saya\s*bertanya)\b",
+    r"^\s*(terkait|mengenai)\s+(pertanyaan|keluhan)\b",
+    r"^\s*(dok(?:ter)?[:,]?\s*(saya|mau|ingin)?)\b",
+]
+intro_regexes = [re.compile(p, re.IGNORECASE) for p in intro_keyword_patterns]
+
+
+# ============================================================
+# 🔹 Hapus kalimat penutup (closing)
+# ============================================================
+closing_patterns = [
+    r"demikian[^.]*$",
+    r"semoga (membantu|bermanfaat)[^.]*$",
+    r"terima kasih[^.]*$",
+    r"sekian[^.]*$",
+    r"salam sehat[^.]*$"
+]
+closing_regexes = [re.compile(p, re.IGNORECASE) for p in closing_patterns]
+
+
+def remove_closing_statements(text: str) -> str:
+    for rgx in closing_regexes:
+        text = rgx.sub("", text).strip()
+    return text
+
+
+# ============================================================
+#  🟦 CLEAN QUESTION  (VERSI AMAN)
+# ============================================================
+def remove_leading_intro_sentences_question(text: str) -> str:
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.strip()
+    if text == "":
+        return text
+
+    sentences = split_sentences(text)
+    if len(sentences) == 1:
+        return tidy_punct(text)
+
+    first = sentences[0].strip()
+    if "?" in first:
+        return tidy_punct(text)
+
+    first_word_count = len(WORD_RE.findall(first))
+    looks_like_intro = False
+
+    for rgx in intro_regexes:
+        if rgx.match(first) or rgx.search(first):
+            looks_like_intro = True
+            break
+
+    if not looks_like_intro or first_word_count > 10:
+        return tidy_punct(text)
+
+    remaining = sentences[1:]
+    result = " ".join([s.strip() for s in remaining if s.strip() != ""])
+    if not result:
+        return tidy_punct(text)
+    return tidy_punct(result)
+
+
+def clean_question_text(text: str) -> str:
+    text = str(text)
+    text = text.replace("\r\n", ". ").replace("\n", ". ")
+    text = text.replace("/", " ")
+    text = text.strip()
+    text = remove_leading_intro_sentences_question(text)
+    text = _RE_DISALLOWED.sub(" ", text)
+    text = tidy_punct(text)
+    return text.lower().strip()
+
+
+# ============================================================
+#  🟩 CLEAN ANSWER (VERSI AGRESIF + TANPA HAPUS NAMA)
+# ============================================================
+def remove_leading_intro_sentences_answer(text: str) -> str:
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.strip()
+    if text == "":
+        return text
+
+    sentences = split_sentences(text)
+    remaining = []
+    skip_mode = True
+
+    for sent in sentences:
+        s = sent.strip()
+        if s == "":
+            continue
+
+        is_intro = False
+        words = WORD_RE.findall(s)
+
+        if len(words) <= 6:
+            for rgx in intro_regexes:
+                if rgx.search(s):
+                    is_intro = True
+                    break
+        else:
+            for rgx in intro_regexes:
+                if rgx.match(s):
+                    is_intro = True
+                    break
+
+        if skip_mode and is_intro:
+            continue
+        else:
+            skip_mode = False
+            remaining.append(s)
+
+    if not remaining:
+        return tidy_punct(text)
+
+    result = " ".join(remaining).strip()
+    return tidy_punct(result)
+
+
+def clean_answer_text(text: str) -> str:
+    text = str(text)
+    text = text.replace("\r\n", ". ").replace("\n", ". ")
+    text = text.replace("/", " ")
+
+    text = remove_leading_intro_sentences_answer(text)
+
+    text = _RE_ALODOKTER.sub("", text)
+    text = _RE_DISALLOWED.sub(" ", text)
+
+    # 🔥 Hapus kalimat penutup
+    text = remove_closing_statements(text)
+
+    text = tidy_punct(text)
+    return text.lower().strip()
+
+
+# ============================================================
+#  ❓ PESAN MULTI-PERTANYAAN → sub-pertanyaan
+# ============================================================
+def split_sub_questions(text: str, min_words: int = 3) -> list:
+    """Pecah pesan pasien menjadi beberapa sub-pertanyaan.
+
+    Kalimat dipecah dengan split_sentences; kalimat konteks (tanpa "?")
+    digabung ke pertanyaan berikutnya, sisa konteks di akhir digabung
+    ke pertanyaan terakhir. Pertanyaan yang terlalu pendek (< min_words
+    kata) digabung ke sub-pertanyaan sebelumnya.
+    """
+    text = _RE_PUNCT_NEWLINE.sub(r"\1 ", str(text))
+    text = _RE_NEWLINES.sub(". ", text)
+    sentences = [s.strip() for s in split_sentences(text.strip())]
+    sentences = [s for s in sentences if s and s != "."]
+
+    groups, current = [], []
+    for sent in sentences:
+        current.append(sent)
+        if sent.endswith("?"):
+            if groups and len(WORD_RE.findall(" ".join(current))) < min_words:
+                groups[-1].extend(current)
+            else:
+                groups.append(current)
+            current = []
+
+    if current:
+        if groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+
+    return [" ".join(g) for g in groups]
+
+
+# ============================================================
+#  ⚡ QUERY — cleaner yang sama dengan corpus, di-memoize
+# ============================================================
+@lru_cache(maxsize=4096)
+def _normalize_query_cached(key: str) -> str:
+    cleaned = clean_question_text(key)
+    return cleaned if cleaned else key.lower()
+
+
+def normalize_query(text: str) -> str:
+    """Bersihkan query seperti pertanyaan corpus (memoized).
+
+    Spasi per baris dan baris kosong dirapikan dulu sehingga query yang
+    identik (beda spasi saja) memakai cache key yang sama; pergantian
+    baris tetap dipertahankan karena menjadi batas kalimat.
+    """
+    lines = (" ".join(line.split()) for line in str(text).splitlines())
+    key = "\n".join(line for line in lines if line)
+    return _normalize_query_cached(key)
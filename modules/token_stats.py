@@ -0,0 +1,221 @@
+# ============================================================
+# 🔤 TOKEN STATS — Pre-pass tokenisasi sebelum encode
+# ------------------------------------------------------------
+# - Tokenisasi batch dengan fast tokenizer milik model
+# - Jumlah token per baris (disimpan ke file embedding)
+# - Histogram + estimasi waktu encode
+# - Pre-truncate atau chunk teks yang melebihi max_seq_length
+# - Cache token ID → re-encode tidak perlu tokenisasi ulang
+# ============================================================
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+TOKEN_CACHE_FILE = "token_cache.npz"
+
+
+# ============================================================
+# Tokenisasi + cache
+# ============================================================
+def tokenize_batch(tokenizer, texts, batch_size=256):
+    """Token ID (dengan special token, TANPA truncation) per teks."""
+    ids = []
+    for start in range(0, len(texts), batch_size):
+        enc = tokenizer(texts[start:start + batch_size],
+                        add_special_tokens=True, truncation=False)
+        ids.extend(enc["input_ids"])
+    return ids
+
+
+def _text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """Cache token ID per teks, disimpan sebagai flat array + offsets.
+
+    Cache terikat pada nama tokenizer; tokenizer lain → cache kosong.
+    """
+
+    def __init__(self, path=TOKEN_CACHE_FILE, tokenizer_name=""):
+        self.path = path
+        self.tokenizer_name = tokenizer_name
+        self._ids = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=True) as data:
+            if str(data["tokenizer"]) != self.tokenizer_name:
+                return
+            flat, offsets = data["flat_ids"], data["offsets"]
+            for i, key in enumerate(data["keys"]):
+                self._ids[key] = flat[offsets[i]:offsets[i + 1]].tolist()
+
+    def tokenize(self, tokenizer, texts, batch_size=256):
+        keys = [_text_key(t) for t in texts]
+        missing = [i for i, k in enumerate(keys) if k not in self._ids]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            new_ids = tokenize_batch(tokenizer, [texts[i] for i in missing],
+                                     batch_size)
+            for i, ids in zip(missing, new_ids):
+                self._ids[keys[i]] = ids
+        return [self._ids[k] for k in keys]
+
+    def save(self):
+        keys = list(self._ids)
+        lengths = [len(self._ids[k]) for k in keys]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        flat = (np.concatenate([self._ids[k] for k in keys]).astype(np.int32)
+                if keys else np.empty(0, dtype=np.int32))
+
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, keys=np.array(keys), flat_ids=flat,
+                 offsets=offsets, tokenizer=np.array(self.tokenizer_name))
+        os.replace(tmp_path, self.path)
+
+
+# ============================================================
+# Truncate / chunk
+# ============================================================
+def truncate_ids(ids, max_len):
+    """Potong ke max_len, token penutup (</s>) dipertahankan."""
+    if len(ids) <= max_len:
+        return list(ids)
+    return list(ids[:max_len - 1]) + [ids[-1]]
+
+
+def chunk_ids(ids, max_len, stride=None):
+    """Pecah teks panjang menjadi beberapa chunk ber-overlap.
+
+    Setiap chunk tetap diawali <s> dan diakhiri </s>.
+    """
+    if len(ids) <= max_len:
+        return [list(ids)]
+    body = ids[1:-1]
+    size = max_len - 2
+    stride = stride or size // 2
+    chunks = []
+    for start in range(0, len(body), stride):
+        chunks.append([ids[0]] + list(body[start:start + size]) + [ids[-1]])
+        if start + size >= len(body):
+            break
+    return chunks
+
+
+# ============================================================
+# Encode langsung dari token ID (tanpa tokenisasi ulang)
+# ============================================================
+def _forward(model, batch_ids, pad_id):
+    import torch
+
+    width = max(len(x) for x in batch_ids)
+    input_ids = np.full((len(batch_ids), width), pad_id, dtype=np.int64)
+    mask = np.zeros((len(batch_ids), width), dtype=np.int64)
+    for i, ids in enumerate(batch_ids):
+        input_ids[i, :len(ids)] = ids
+        mask[i, :len(ids)] = 1
+
+    features = {
+        "input_ids": torch.from_numpy(input_ids).to(model.device),
+        "attention_mask": torch.from_numpy(mask).to(model.device),
+    }
+    with torch.no_grad():
+        out = model(features)["sentence_embedding"]
+    return out.float().cpu().numpy()
+
+
+def encode_from_ids(model, ids_list, batch_size=32, long_text="truncate",
+                    show_progress_bar=False):
+    """Embedding ternormalisasi L2 dari token ID.
+
+    long_text="truncate" → potong ke max_seq_length
+    long_text="chunk"    → rata-rata embedding semua chunk per baris
+    Baris diurutkan menurut panjang agar padding per batch minimal.
+    """
+    max_len = model.max_seq_length
+    pad_id = model.tokenizer.pad_token_id
+
+    if long_text == "chunk":
+        pieces, owner = [], []
+        for row, ids in enumerate(ids_list):
+            for c in chunk_ids(ids, max_len):
+                pieces.append(c)
+                owner.append(row)
+    else:
+        pieces = [truncate_ids(ids, max_len) for ids in ids_list]
+        owner = list(range(len(ids_list)))
+
+    order = np.argsort([len(p) for p in pieces], kind="stable")
+    emb = None
+    starts = range(0, len(order), batch_size)
+    if show_progress_bar:
+        from tqdm.auto import tqdm
+        starts = tqdm(starts, desc="Batches")
+
+    for start in starts:
+        sel = order[start:start + batch_size]
+        out = _forward(model, [pieces[i] for i in sel], pad_id)
+        if emb is None:
+            emb = np.zeros((len(pieces), out.shape[1]), dtype=np.float32)
+        emb[sel] = out
+
+    if long_text == "chunk":
+        pooled = np.zeros((len(ids_list), emb.shape[1]), dtype=np.float32)
+        np.add.at(pooled, np.asarray(owner), emb)
+        emb = pooled
+
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True) + 1e-12
+    return emb
+
+
+# ============================================================
+# Laporan
+# ============================================================
+def estimate_encode_seconds(model, ids_list, sample_size=64, batch_size=32):
+    """Estimasi waktu encode dari throughput token pada sampel kecil."""
+    max_len = model.max_seq_length
+    lengths = np.minimum([len(x) for x in ids_list], max_len)
+    if not len(lengths):
+        return 0.0
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(ids_list), min(sample_size, len(ids_list)),
+                        replace=False)
+    t0 = time.perf_counter()
+    encode_from_ids(model, [ids_list[i] for i in sample], batch_size)
+    elapsed = time.perf_counter() - t0
+
+    sec_per_token = elapsed / max(int(lengths[sample].sum()), 1)
+    return float(sec_per_token * lengths.sum())
+
+
+def token_report(label, counts, max_len, est_seconds=None, bins=10):
+    """Teks ringkasan: statistik, histogram, jumlah baris terpotong."""
+    counts = np.asarray(counts)
+    n_long = int(np.sum(counts > max_len))
+    lines = [
+        f"📏 Token {label}: n={len(counts)}  mean={counts.mean():.1f}  "
+        f"p50={np.percentile(counts, 50):.0f}  p95={np.percentile(counts, 95):.0f}  "
+        f"max={counts.max()}",
+        f"   > max_seq_length ({max_len}): {n_long} baris "
+        f"({100 * n_long / len(counts):.1f}%)",
+    ]
+
+    hist, edges = np.histogram(counts, bins=bins)
+    peak = max(hist.max(), 1)
+    for h, lo, hi in zip(hist, edges[:-1], edges[1:]):
+        bar = "█" * int(round(30 * h / peak))
+        lines.append(f"   {lo:>6.0f}–{hi:<6.0f} | {bar} {h}")
+
+    if est_seconds is not None:
+        lines.append(f"   ⏱ Estimasi waktu encode: {est_seconds:.1f} detik")
+    return "\n".join(lines)